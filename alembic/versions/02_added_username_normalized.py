@@ -0,0 +1,90 @@
+"""added: username_normalized
+
+Revision ID: 3c1e5a7b9d20
+Revises: 9017c3813154
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+from src.adaptors.users import normalize_username
+
+# revision identifiers, used by Alembic.
+revision = "3c1e5a7b9d20"
+down_revision = "9017c3813154"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+users = sa.table(
+    "users",
+    sa.column("id"),
+    sa.column("username", sa.String),
+    sa.column("username_normalized", sa.String),
+)
+
+
+def backfill(conn) -> None:
+    # Normalize in Python with the same function lookups use: SQL lower() depends on
+    # the database collation and disagrees with str.lower() for some non-ASCII names.
+    rows = conn.execute(sa.select(users.c.id, users.c.username)).fetchall()
+    update = (
+        sa.update(users)
+        .where(users.c.id == sa.bindparam("user_id"))
+        .values(username_normalized=sa.bindparam("normalized"))
+    )
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        conn.execute(
+            update,
+            [
+                {"user_id": user_id, "normalized": normalize_username(username)}
+                for user_id, username in rows[start : start + BACKFILL_BATCH_SIZE]
+            ],
+        )
+
+
+def assert_no_duplicates(conn) -> None:
+    duplicates = conn.execute(
+        sa.select(users.c.username_normalized, sa.func.count())
+        .group_by(users.c.username_normalized)
+        .having(sa.func.count() > 1)
+    ).fetchall()
+    if duplicates:
+        names = ", ".join(f"{name!r} ({count} users)" for name, count in duplicates[:20])
+        raise RuntimeError(
+            "Some users have usernames that only differ in case, so the unique index on "
+            f"username_normalized cannot be built: {names}. Rename or merge these users "
+            "and run the migration again."
+        )
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("username_normalized", sa.String(), nullable=True))
+    conn = op.get_bind()
+    backfill(conn)
+    # Checked before the index is built: a failing CREATE INDEX CONCURRENTLY would leave
+    # an INVALID index behind, while raising here rolls back the whole migration.
+    assert_no_duplicates(conn)
+    op.alter_column("users", "username_normalized", nullable=False)
+    # Build the index without locking writes to users; CONCURRENTLY cannot run inside
+    # the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_username_normalized",
+            "users",
+            ["username_normalized"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_users_username_normalized",
+            table_name="users",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("users", "username_normalized")
@@ -0,0 +1,112 @@
+"""Run the auth hot-path benchmarks and save the results as JSON.
+
+    python -m benchmarks --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python -m benchmarks --suite jwt --suite access_control
+    python -m benchmarks --compare old.json new.json
+
+Results are keyed by suite and case; latency fields end in `_us` and throughput is
+`ops_per_s`. `--compare` prints the relative change of the median (or per-call, for the
+statements suite) latency of every case in both files, and exits non-zero when one got
+slower by more than `--threshold`. Tail percentiles are kept in the JSON but not
+compared: with a few hundred samples they are too noisy to gate on.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable
+
+from . import access_control, jwt, middleware, password, statements
+
+SUITES: dict[str, Callable[[float], dict]] = {
+    "jwt": lambda scale: jwt.run(iterations=int(5_000 * scale)),
+    "password": lambda scale: password.run(iterations=max(int(20 * scale), 1)),
+    "access_control": lambda scale: access_control.run(iterations=int(200 * scale)),
+    "statements": lambda scale: statements.run(iterations=int(20_000 * scale)),
+    "middleware": lambda scale: middleware.run(iterations=int(200 * scale)),
+}
+
+
+COMPARED_METRICS = ("p50_us", "build_us", "execute_us")
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(suites: list[str], scale: float = 1.0) -> dict:
+    results = {}
+    for name in suites:
+        print(f"running {name}...", file=sys.stderr)
+        results[name] = SUITES[name](scale)
+    return {
+        "meta": {
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "scale": scale,
+        },
+        "results": results,
+    }
+
+
+def flatten(results: dict) -> dict[str, float]:
+    return {
+        f"{suite}.{case}.{metric}": value
+        for suite, cases in results.items()
+        for case, metrics in cases.items()
+        for metric, value in metrics.items()
+        if metric in COMPARED_METRICS
+    }
+
+
+def compare(old: dict, new: dict, threshold: float) -> list[str]:
+    """Print the change of each compared metric in both runs; return the regressed ones."""
+    old_metrics, new_metrics = flatten(old["results"]), flatten(new["results"])
+    regressions = []
+    for key in sorted(old_metrics.keys() & new_metrics.keys()):
+        before, after = old_metrics[key], new_metrics[key]
+        if not before:
+            continue
+        change = (after - before) / before
+        marker = ""
+        if change > threshold:
+            regressions.append(key)
+            marker = "  REGRESSION"
+        print(f"{key:<70}{before:>14.2f}{after:>14.2f}{change:>+9.1%}{marker}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", action="append", choices=list(SUITES))
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply iteration counts")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.compare:
+        old, new = (json.load(open(path)) for path in args.compare)
+        return 1 if compare(old, new, args.threshold) else 0
+
+    report = run(args.suite or list(SUITES), args.scale)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""AccessControl.has_permission over growing ACLs and resource lists.
+
+Each resource's ACL grants the checked permission only in its last entry, so every
+check scans the whole list: the worst case for the linear walk in has_permission.
+
+    python -m benchmarks.access_control
+"""
+import argparse
+
+from src.core.access_controll import AccessControl, Allow, RolePrincipal, UserPrincipal
+
+from .common import measure
+
+MAX_ENTRIES = 500_000
+
+
+class Resource:
+    def __init__(self, acl: list) -> None:
+        self.__acl__ = acl
+
+
+def build_resource(acl_size: int, principal: UserPrincipal) -> Resource:
+    acl = [
+        (Allow, RolePrincipal(value=f"role-{index}"), ["read", "edit"])
+        for index in range(acl_size - 1)
+    ]
+    acl.append((Allow, principal, ["read", "edit"]))
+    return Resource(acl)
+
+
+def run(
+    acl_sizes: tuple[int, ...] = (10, 100, 1_000),
+    resource_counts: tuple[int, ...] = (1, 100),
+    iterations: int = 200,
+) -> dict[str, dict[str, float]]:
+    principal = UserPrincipal(value="benchmark")
+    principals = [principal, RolePrincipal(value="user")]
+    access_control = AccessControl(user_principals_getter=lambda: principals)
+    results: dict[str, dict[str, float]] = {}
+    for acl_size in acl_sizes:
+        for resource_count in resource_counts:
+            resources = [build_resource(acl_size, principal) for _ in range(resource_count)]
+            # Cap the work per case so the largest ACL and resource list still run in a
+            # second or two.
+            case_iterations = max(5, min(iterations, MAX_ENTRIES // (acl_size * resource_count)))
+            results[f"has_permission.acl_{acl_size}.resources_{resource_count}"] = measure(
+                lambda: access_control.has_permission(principals, "edit", resources),
+                case_iterations,
+                warmup=1,
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    for name, result in run(iterations=args.iterations).items():
+        print(f"{name:<42}{result['ops_per_s']:>12.0f} ops/s{result['p50_us']:>12.1f} us p50")
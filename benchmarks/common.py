@@ -0,0 +1,46 @@
+import statistics
+import time
+from typing import Any, Awaitable, Callable
+
+
+def summarize(timings: list[float], total: float) -> dict[str, float]:
+    """Throughput and latency percentiles (in microseconds) from per-op timings."""
+    timings = sorted(timings)
+
+    def percentile(fraction: float) -> float:
+        return timings[min(int(len(timings) * fraction), len(timings) - 1)] * 1_000_000
+
+    return {
+        "iterations": len(timings),
+        "ops_per_s": len(timings) / total if total else 0.0,
+        "mean_us": statistics.fmean(timings) * 1_000_000,
+        "p50_us": percentile(0.50),
+        "p95_us": percentile(0.95),
+        "p99_us": percentile(0.99),
+    }
+
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int = 10) -> dict[str, float]:
+    for _ in range(warmup):
+        func()
+    timings = []
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        op_start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - op_start)
+    return summarize(timings, time.perf_counter() - start_time)
+
+
+async def measure_async(
+    func: Callable[[], Awaitable[Any]], iterations: int, warmup: int = 10
+) -> dict[str, float]:
+    for _ in range(warmup):
+        await func()
+    timings = []
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        op_start = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - op_start)
+    return summarize(timings, time.perf_counter() - start_time)
@@ -0,0 +1,33 @@
+"""JWTHandler.encode and decode, with the verified-claims cache hit and cold.
+
+    python -m benchmarks.jwt
+"""
+import argparse
+
+from src.repository.jwt import JWTHandler
+
+from .common import measure
+
+
+def run(iterations: int = 5_000) -> dict[str, dict[str, float]]:
+    token = JWTHandler.encode({"user_id": "benchmark"})
+
+    def decode_cold():
+        JWTHandler.token_cache.clear()
+        JWTHandler.decode(token)
+
+    results = {
+        "encode": measure(lambda: JWTHandler.encode({"user_id": "benchmark"}), iterations),
+        "decode.cold": measure(decode_cold, iterations),
+        "decode.cached": measure(lambda: JWTHandler.decode(token), iterations),
+    }
+    JWTHandler.token_cache.clear()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5_000)
+    args = parser.parse_args()
+    for name, result in run(args.iterations).items():
+        print(f"{name:<16}{result['ops_per_s']:>12.0f} ops/s{result['p50_us']:>10.1f} us p50")
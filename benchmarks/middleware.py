@@ -0,0 +1,84 @@
+"""Requests through the full app and middleware stack, on in-memory SQLite and RedisMock.
+
+The auth timing floor is switched off and bcrypt runs at its minimum cost, so the
+numbers show the framework, middleware, database and redis overhead per request rather
+than the deliberate padding and hashing (see benchmarks.password for those).
+
+    python -m benchmarks.middleware
+"""
+import argparse
+import asyncio
+import itertools
+
+from httpx import AsyncClient
+
+from src.core.database.session import DBManager, SQLBase, get_db
+from src.core.fastapi import app
+from src.core.redis.client import get_redis_db
+from src.repository.password import BCRYPT_MIN_ROUNDS, PasswordHandler
+from src.routers.auth import timing_equalizer
+from tests.shared.mocks.redis import RedisMock
+
+from .common import measure_async
+
+CREDENTIALS = {"username": "benchmark", "password": "benchmark-password"}
+
+
+async def _run(iterations: int) -> dict[str, dict[str, float]]:
+    database = DBManager(model_base=SQLBase, db_url="sqlite+aiosqlite:///:memory:")
+    await database.create_tables()
+    redis = RedisMock()
+    app.dependency_overrides[get_db] = lambda: database
+    app.dependency_overrides[get_redis_db] = lambda: redis
+    counter = itertools.count()
+
+    async def request(method: str, url: str, **kwargs) -> None:
+        response = await client.request(method, url, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url} returned {response.status_code}")
+
+    async def register() -> None:
+        data = {"username": f"user-{next(counter)}", "password": CREDENTIALS["password"]}
+        await request("POST", "/auth/register", json=data)
+
+    try:
+        async with AsyncClient(app=app, base_url="http://benchmark") as client:
+            await app.router.startup()
+            try:
+                await request("POST", "/auth/register", json=CREDENTIALS)
+                return {
+                    "jwks": await measure_async(
+                        lambda: request("GET", "/auth/.well-known/jwks.json"), iterations
+                    ),
+                    "register": await measure_async(register, iterations),
+                    "login": await measure_async(
+                        lambda: request("POST", "/auth/login", json=CREDENTIALS), iterations
+                    ),
+                }
+            finally:
+                await app.router.shutdown()
+    finally:
+        app.dependency_overrides.clear()
+        await database.dispose()
+
+
+def run(iterations: int = 200) -> dict[str, dict[str, float]]:
+    floor, jitter = timing_equalizer.floor, timing_equalizer.jitter
+    pwd_context, pwd_config = PasswordHandler.pwd_context, PasswordHandler.pwd_config
+    timing_equalizer.floor = timing_equalizer.jitter = 0.0
+    PasswordHandler.configure(BCRYPT_MIN_ROUNDS)
+    try:
+        return asyncio.run(_run(iterations))
+    finally:
+        timing_equalizer.floor, timing_equalizer.jitter = floor, jitter
+        PasswordHandler.pwd_context, PasswordHandler.pwd_config = pwd_context, pwd_config
+        PasswordHandler.dummy_hash = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    for name, result in run(args.iterations).items():
+        p50_ms = result["p50_us"] / 1000
+        print(f"{name:<12}{result['ops_per_s']:>10.0f} req/s{p50_ms:>10.2f} ms p50")
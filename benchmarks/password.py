@@ -0,0 +1,44 @@
+"""Bcrypt verify latency at several costs, inline and through the PasswordHandler pool.
+
+    python -m benchmarks.password --rounds 4 8 10 12
+"""
+import argparse
+import asyncio
+
+from src.repository.password import PasswordHandler, build_context
+
+from .common import measure, measure_async
+
+
+def run(rounds: tuple[int, ...] = (4, 8, 10), iterations: int = 20) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    original = PasswordHandler.pwd_context, PasswordHandler.pwd_config
+    try:
+        for cost in rounds:
+            context = build_context(cost)
+            hashed = context.hash("benchmark")
+            results[f"verify.rounds_{cost}"] = measure(
+                lambda: context.verify("benchmark", hashed), iterations, warmup=1
+            )
+            PasswordHandler.configure(cost)
+            results[f"verify_async.rounds_{cost}"] = asyncio.run(
+                measure_async(
+                    lambda: PasswordHandler.verify_async(hashed, "benchmark"),
+                    iterations,
+                    warmup=1,
+                )
+            )
+    finally:
+        PasswordHandler.pwd_context, PasswordHandler.pwd_config = original
+        PasswordHandler.dummy_hash = None
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, nargs="+", default=[4, 8, 10])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    for name, result in run(tuple(args.rounds), args.iterations).items():
+        p50_ms = result["p50_us"] / 1000
+        print(f"{name:<26}{result['ops_per_s']:>10.1f} ops/s{p50_ms:>10.2f} ms p50")
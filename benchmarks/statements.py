@@ -0,0 +1,74 @@
+"""Per-call overhead of building UserAdaptor statements, before and after lambda caching.
+
+"before" rebuilds the select and its column list on every call, as UserAdaptor used to;
+"after" goes through the current lambda statements. Each variant is timed for building
+plus cache-key generation (what SQLAlchemy pays before it can reuse a compiled form)
+and for a full execute against in-memory SQLite.
+
+    python -m benchmarks.statements
+"""
+import argparse
+import time
+import uuid
+
+import sqlalchemy as sa
+
+from src.adaptors.users import UserAdaptor
+from src.core.database.base import SQLBase
+from src.models import User
+from src.schema.query.user import UserQuery
+
+
+def legacy_query_by_id(user_id: str):
+    selects = [getattr(User, field) for field in UserQuery.__fields__]
+    return sa.select(*selects).where(User.id == user_id)
+
+
+def legacy_get_by_username(username: str):
+    return sa.select(User).where(sa.func.lower(User.username) == sa.func.lower(username))
+
+
+VARIANTS = {
+    "query_by_id": (legacy_query_by_id, UserAdaptor.query_by_id),
+    "get_by_username": (legacy_get_by_username, UserAdaptor.get_by_username),
+}
+
+
+def per_call_us(func, iterations: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start_time) / iterations * 1_000_000
+
+
+def run(iterations: int = 20_000) -> dict[str, dict[str, float]]:
+    engine = sa.create_engine("sqlite://")
+    SQLBase.metadata.create_all(engine)
+    user_id = str(uuid.uuid4())
+    args = {"query_by_id": user_id, "get_by_username": "benchmark"}
+    results: dict[str, dict[str, float]] = {}
+    with engine.connect() as conn:
+        for name, (before, after) in VARIANTS.items():
+            arg = args[name]
+            for label, builder in (("before", before), ("after", after)):
+                builder(arg)._generate_cache_key()
+                conn.execute(builder(arg)).first()
+                results[f"{name}.{label}"] = {
+                    "build_us": per_call_us(
+                        lambda: builder(arg)._generate_cache_key(), iterations
+                    ),
+                    "execute_us": per_call_us(
+                        lambda: conn.execute(builder(arg)).first(), iterations // 4
+                    ),
+                }
+    engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+    print(f"{'statement':<26}{'build+key us':>14}{'execute us':>12}")
+    for name, result in run(args.iterations).items():
+        print(f"{name:<26}{result['build_us']:>14.2f}{result['execute_us']:>12.2f}")
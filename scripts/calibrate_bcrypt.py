@@ -0,0 +1,18 @@
+import argparse
+
+from src.core.config import settings
+from src.repository.password import BCRYPT_MAX_ROUNDS, BCRYPT_MIN_ROUNDS, calibrate_rounds
+
+parser = argparse.ArgumentParser(description="Pick bcrypt rounds for a per-verify latency target")
+parser.add_argument("--target-ms", type=float, default=settings.BCRYPT_TARGET_MS)
+parser.add_argument("--min-rounds", type=int, default=BCRYPT_MIN_ROUNDS)
+parser.add_argument("--max-rounds", type=int, default=BCRYPT_MAX_ROUNDS)
+parser.add_argument("--samples", type=int, default=3)
+args = parser.parse_args()
+
+rounds, timings = calibrate_rounds(
+    args.target_ms, min_rounds=args.min_rounds, max_rounds=args.max_rounds, samples=args.samples
+)
+for cost, elapsed_ms in timings.items():
+    print(f"rounds={cost:<3} verify={elapsed_ms:8.2f} ms")
+print(f"BCRYPT_ROUNDS={rounds}")
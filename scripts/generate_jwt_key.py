@@ -0,0 +1,22 @@
+import argparse
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+CURVES = {"ES256": ec.SECP256R1, "ES384": ec.SECP384R1, "ES512": ec.SECP521R1}
+
+parser = argparse.ArgumentParser(description="Generate an EC private key for JWT signing")
+parser.add_argument("path", help="Output PEM file, its name without suffix becomes the kid")
+parser.add_argument("--algorithm", choices=list(CURVES), default="ES256")
+args = parser.parse_args()
+
+private_key = ec.generate_private_key(CURVES[args.algorithm]())
+Path(args.path).write_bytes(
+    private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+)
+print(f"Wrote {args.path} (kid={Path(args.path).stem})")
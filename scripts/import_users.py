@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import AsyncIterator
+
+from src.controllers.user_import import ImportFormat, ImportStats, UserImporter
+from src.core.config import settings
+from src.core.database import SQL_DB
+
+parser = argparse.ArgumentParser(description="Bulk import users from a CSV or NDJSON file")
+parser.add_argument("path", type=Path, help="input file, or - for stdin")
+parser.add_argument("--format", choices=[fmt.value for fmt in ImportFormat], default=None)
+parser.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE)
+args = parser.parse_args()
+
+fmt = ImportFormat(args.format or ("csv" if args.path.suffix == ".csv" else "ndjson"))
+
+
+async def read_lines(path: Path) -> AsyncIterator[str]:
+    with sys.stdin if str(path) == "-" else path.open(encoding="utf-8") as file:
+        for line in file:
+            yield line
+
+
+def report(stats: ImportStats) -> None:
+    print(
+        f"batch={stats.batches:<6} read={stats.read:<9} inserted={stats.inserted:<9} "
+        f"skipped={stats.skipped:<7} invalid={stats.invalid:<7} {stats.rate:8.0f} rows/s",
+        flush=True,
+    )
+
+
+async def main() -> None:
+    importer = UserImporter(db_session=SQL_DB, batch_size=args.batch_size, on_progress=report)
+    try:
+        stats = await importer.run(read_lines(args.path), fmt)
+    finally:
+        importer.pool.shutdown()
+    print(f"done in {stats.elapsed:.1f}s: {stats.as_dict()}")
+
+
+asyncio.run(main())
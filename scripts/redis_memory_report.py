@@ -0,0 +1,22 @@
+import argparse
+import asyncio
+
+from src.core.redis.client import RedisManager
+from src.core.redis.report import memory_by_prefix
+
+parser = argparse.ArgumentParser(description="Report redis memory use per key prefix")
+parser.add_argument("--sample-size", type=int, default=1000)
+args = parser.parse_args()
+
+
+async def report():
+    usage = await memory_by_prefix(RedisManager().redis, sample_size=args.sample_size)
+    print(f"{'prefix':<12}{'sampled':>10}{'avg bytes':>12}{'est. keys':>14}{'est. MiB':>12}")
+    for item in usage:
+        print(
+            f"{item.prefix:<12}{item.sampled_keys:>10}{item.avg_bytes:>12.1f}"
+            f"{item.estimated_keys:>14.0f}{item.estimated_bytes / 2**20:>12.2f}"
+        )
+
+
+asyncio.run(report())
@@ -1,31 +1,105 @@
+import uuid
+
 import sqlalchemy as sa
 from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
 
 from ..models import User
 from ..schema.query.user import UserQuery
 
 
+def normalize_username(username: str) -> str:
+    # Also used by migration 02 to backfill existing rows, so stored and looked up
+    # values always come from the same rule.
+    return username.lower()
+
+
+USER_QUERY_COLUMNS = tuple(getattr(User, field) for field in UserQuery.__fields__)
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING together with RETURNING.
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
 class UserAdaptor:
+    """Statements for the users table.
+
+    Each query is a lambda statement: SQLAlchemy builds and compiles it once per call
+    site and afterwards only extracts the closure values as bound parameters, instead
+    of rebuilding the select and its cache key on every call.
+    """
+
     @staticmethod
     def get_selects():
-        return [getattr(User, field) for field in UserQuery.__fields__]
+        return list(USER_QUERY_COLUMNS)
 
     @staticmethod
     def get_by_username(username: str):
-        return sa.select(User).where(func.lower(User.username) == func.lower(username))
+        username_normalized = normalize_username(username)
+        return sa.lambda_stmt(
+            lambda: sa.select(User).where(User.username_normalized == username_normalized)
+        )
 
     @staticmethod
     def get_by_id(user_id: str):
-        return sa.select(User).where(User.id == user_id)
+        return sa.lambda_stmt(lambda: sa.select(User).where(User.id == user_id))
 
     @staticmethod
     def query_by_username(username: str):
-        return sa.select(*UserAdaptor.get_selects()).where(User.username.ilike(username))
+        username_normalized = normalize_username(username)
+        return sa.lambda_stmt(
+            lambda: sa.select(*USER_QUERY_COLUMNS).where(
+                User.username_normalized == username_normalized
+            )
+        )
 
     @staticmethod
     def query_by_id(user_id: str):
-        return sa.select(*UserAdaptor.get_selects()).where(User.id == user_id)
+        return sa.lambda_stmt(lambda: sa.select(*USER_QUERY_COLUMNS).where(User.id == user_id))
+
+    @staticmethod
+    def update_password(user_id: str, password: str):
+        return sa.lambda_stmt(
+            lambda: sa.update(User)
+            .where(User.id == user_id)
+            .values(password=password, updated_at=func.now())
+        )
 
     @staticmethod
-    def create(username: str, password: str, gauth: str):
-        return User(username=username, password=password, gauth=gauth)
+    def insert(username: str, password: str, gauth: str, dialect: str):
+        """INSERT that skips rows clashing with an existing username and returns the new row.
+
+        It returns no row on a conflict, so checking for and creating a user is a single
+        statement with no race between the two.
+        """
+        if dialect not in UPSERT_INSERTS:
+            raise ValueError(f"Unsupported dialect for user insert: {dialect}")
+        return (
+            UPSERT_INSERTS[dialect](User)
+            .values(
+                id=uuid.uuid4(),
+                username=username,
+                username_normalized=normalize_username(username),
+                password=password,
+                gauth=gauth,
+                created_at=func.now(),
+                updated_at=func.now(),
+            )
+            .on_conflict_do_nothing()
+            .returning(*USER_QUERY_COLUMNS)
+        )
+
+    @staticmethod
+    def bulk_insert(dialect: str):
+        """INSERT for executemany batches; rows clashing with existing users are skipped.
+
+        Each parameter set carries id, username, username_normalized, password and
+        gauth, and the returned ids are the rows that were actually inserted.
+        """
+        if dialect not in UPSERT_INSERTS:
+            raise ValueError(f"Unsupported dialect for user insert: {dialect}")
+        return (
+            UPSERT_INSERTS[dialect](User)
+            .values(created_at=func.now(), updated_at=func.now())
+            .on_conflict_do_nothing()
+            .returning(User.id)
+        )
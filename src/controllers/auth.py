@@ -1,17 +1,17 @@
-import asyncio
 import base64
-import io
 
-import qrcode
 from pyotp import random_base32, totp
 
 from src.core.config import settings
 
 from ..core.database import DBManager
 from ..core.exceptions import BadRequestException, CustomException, UnauthorizedException
-from ..core.redis.client import RedisManager
+from ..core.instrumentation import instrumented
+from ..core.redis.client import RedisKey, RedisManager, RotationResult
+from ..repository.csrf import CSRFHandler
 from ..repository.jwt import JWTHandler
 from ..repository.password import PasswordHandler
+from ..repository.qr_code import QRCodeHandler, QRFormat
 from ..repository.users import UserRepository
 from ..schema.out.auth import Token
 from ..schema.out.user import UserOut, UserOutRegister
@@ -21,6 +21,8 @@ class AuthController:
     user_adaptor = UserRepository()
     password_handler = PasswordHandler
     jwt_handler = JWTHandler
+    csrf_handler = CSRFHandler
+    qr_code_handler = QRCodeHandler
 
     def __init__(
         self,
@@ -32,51 +34,61 @@ class AuthController:
         self.db_session = db_session
         self.redis_session = redis_session
 
-    async def register(self, password: str, username: str) -> UserOutRegister:
-        user = await self.user_adaptor.get_by_username(username, db_session=self.db_session)
-
-        if user:
-            raise BadRequestException("User already exists with this username")
-
-        password = self.password_handler.hash(password)
-        user = await self.user_adaptor.get_and_create(
+    @instrumented("auth.register")
+    async def register(
+        self, password: str, username: str, qr_format: QRFormat | None = None
+    ) -> UserOutRegister:
+        password = await self.password_handler.hash_async(password)
+        user = await self.user_adaptor.create(
             username=username,
             password=password,
             gauth=str(random_base32()),
             db_session=self.db_session,
         )
-        assert user is not None
+        if not user:
+            raise BadRequestException("User already exists with this username")
         provisioning_uri = totp.TOTP(user.gauth).provisioning_uri()
-        buffered = io.BytesIO()
-        qrcode.make(provisioning_uri).save(buffered)
+        qr_img = None
+        if qr_format is not None:
+            image = await self.qr_code_handler.render(provisioning_uri, qr_format)
+            qr_img = base64.b64encode(image).decode()
         return UserOutRegister(
             username=user.username,
             updated_at=user.updated_at,
             created_at=user.created_at,
             gauth=user.gauth,
-            qr_img=base64.b64encode(buffered.getvalue()).decode(),
+            provisioning_uri=provisioning_uri,
+            qr_img=qr_img,
         )
 
+    @instrumented("auth.login")
     async def login(self, username: str, password: str) -> Token:
         if not self.redis_session:
             raise CustomException("Database connection is not initialized")
 
         user = await self.user_adaptor.get_by_username(username, db_session=self.db_session)
-        print(user)
-        if (not user) or (not self.password_handler.verify(user.password, password)):
+        if not user:
+            await self.password_handler.dummy_verify_async(password)
             raise BadRequestException("Invalid credentials")
+        if not await self.password_handler.verify_async(user.password, password):
+            raise BadRequestException("Invalid credentials")
+
+        if self.password_handler.needs_update(user.password):
+            await self.user_adaptor.update_password(
+                user.id,
+                await self.password_handler.hash_async(password),
+                db_session=self.db_session,
+                redis_session=self.redis_session,
+            )
 
         refresh_token = self.jwt_handler.encode_refresh_token(
             payload={"sub": "refresh_token", "verify": str(user.id)}
         )
-        csrf_token = self.jwt_handler.encode_refresh_token(
-            payload={
-                "sub": "csrf_token",
-                "refresh_token": str(refresh_token),
-            }
-        )
+        csrf_token = self.csrf_handler.encode(refresh_token=refresh_token)
         await self.redis_session.set(
-            name=refresh_token, value=user.id, ex=self.jwt_handler.refresh_token_expire
+            name=RedisKey.refresh_token(refresh_token),
+            value=user.id,
+            ex=self.jwt_handler.refresh_token_expire,
         )
         return Token(
             access_token=None,
@@ -84,22 +96,33 @@ class AuthController:
             csrf_token=csrf_token,
         )
 
+    @instrumented("auth.logout")
     async def logout(self, refresh_token) -> None:
         if not refresh_token:
             raise BadRequestException
         if not self.redis_session:
             raise CustomException("Database connection is not initialized")
-        await self.redis_session.delete(refresh_token)
+        await self.redis_session.delete(RedisKey.refresh_token(refresh_token))
         return None
 
+    @instrumented("auth.me")
     async def me(self, user_id) -> UserOut:
+        user = await self.user_adaptor.get_profile(
+            user_id, db_session=self.db_session, redis_session=self.redis_session
+        )
+        if not user:
+            raise BadRequestException("Invalid credentials")
+        return user
+
+    @instrumented("auth.qr_code")
+    async def qr_code(self, user_id: str, qr_format: QRFormat) -> bytes:
         user = await self.user_adaptor.query_by_id(user_id, db_session=self.db_session)
         if not user:
             raise BadRequestException("Invalid credentials")
-        return UserOut(
-            username=user.username, updated_at=user.updated_at, created_at=user.created_at
-        )
+        provisioning_uri = totp.TOTP(user.gauth).provisioning_uri()
+        return await self.qr_code_handler.render(provisioning_uri, qr_format)
 
+    @instrumented("auth.verify")
     async def verify(
         self,
         refresh_token: str,
@@ -109,8 +132,8 @@ class AuthController:
     ) -> None:
         if not self.redis_session:
             raise CustomException("Database connection is not initialized")
-        session_id_redis, user_id = await asyncio.gather(
-            self.redis_session.get(session_id), self.redis_session.get(refresh_token)
+        session_id_redis, user_id = await self.redis_session.mget(
+            RedisKey.session(session_id), RedisKey.refresh_token(refresh_token)
         )
         if not user_id or len(str(user_id)) < 5:
             raise UnauthorizedException("Invalid Refresh Token")
@@ -119,44 +142,38 @@ class AuthController:
             assert user is not None
             if not totp.TOTP(user.gauth).verify(code):
                 raise BadRequestException("Invalid Code")
-            print(user_id)
             await self.redis_session.set(
-                session_id, value=user_id, ex=(settings.SESSION_EXPIRE_MINUTES) * 60
+                RedisKey.session(session_id),
+                value=user_id,
+                ex=(settings.SESSION_EXPIRE_MINUTES) * 60,
             )
         else:
             raise BadRequestException("Already Verified")
         return None
 
-    async def refresh_token(self, old_refresh_token: str, session_id: str) -> Token:
+    @instrumented("auth.refresh_token")
+    async def refresh_token(self, old_refresh_token: str, session_id: str, user_id: str) -> Token:
         if not self.redis_session:
             raise CustomException("Database connection is not initialized")
 
-        user_id, ttl, session_id = await asyncio.gather(
-            self.redis_session.get(old_refresh_token),
-            self.redis_session.ttl(old_refresh_token),
-            self.redis_session.get(session_id),
-        )
-        if not user_id or len(str(user_id)) < 5:
-            raise UnauthorizedException("Invalid Refresh Token")
-
-        if session_id != user_id:
-            raise UnauthorizedException("Please verify using 2 step authenication first")
-
         access_token = self.jwt_handler.encode(payload={"user_id": str(user_id)})
         refresh_token = self.jwt_handler.encode_refresh_token(
             payload={"sub": "refresh_token", "verify": str(user_id)}
         )
-        csrf_token = self.jwt_handler.encode_refresh_token(
-            payload={
-                "sub": "csrf_token",
-                "refresh_token": str(refresh_token),
-                "access_token": str(access_token),
-            }
+        csrf_token = self.csrf_handler.encode(
+            refresh_token=refresh_token, access_token=access_token
         )
-        await asyncio.gather(
-            self.redis_session.set(refresh_token, user_id, ex=ttl),
-            self.redis_session.delete(old_refresh_token),
+        result = await self.redis_session.rotate_refresh_token(
+            RedisKey.refresh_token(old_refresh_token),
+            RedisKey.refresh_token(refresh_token),
+            RedisKey.session(session_id),
+            user_id,
         )
+        if result == RotationResult.INVALID:
+            raise UnauthorizedException("Invalid Refresh Token")
+        if result == RotationResult.NOT_VERIFIED:
+            raise UnauthorizedException("Please verify using 2 step authenication first")
+
         return Token(
             access_token=access_token,
             refresh_token=refresh_token,
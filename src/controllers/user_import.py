@@ -0,0 +1,297 @@
+import asyncio
+import base64
+import binascii
+import csv
+import json
+import logging
+import math
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import IO, AsyncIterable, AsyncIterator, Callable
+
+from pyotp import random_base32
+
+from ..adaptors.users import normalize_username
+from ..core.config import settings
+from ..core.database import DBManager
+from ..core.executor import WorkerPool
+from ..repository.password import PasswordHandler, _hash_many
+from ..repository.users import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8")
+    if buffer:
+        yield buffer.decode("utf-8")
+
+
+async def spool(chunks: AsyncIterable[bytes]) -> IO[bytes]:
+    """Copy an upload to a temporary file, so it can be imported after the request ends."""
+    file = tempfile.TemporaryFile()
+    async for chunk in chunks:
+        await asyncio.to_thread(file.write, chunk)
+    file.seek(0)
+    return file
+
+
+async def read_chunks(file: IO[bytes], chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    while chunk := await asyncio.to_thread(file.read, chunk_size):
+        yield chunk
+
+
+def is_base32_secret(value: str) -> bool:
+    # Decoded the way pyotp does it, so anything accepted here works for TOTP later.
+    padded = value + "=" * (-len(value) % 8)
+    try:
+        return bool(base64.b32decode(padded, casefold=True))
+    except (binascii.Error, ValueError):
+        return False
+
+
+class RecordParser:
+    """Turns input lines into user records one line at a time, so input can be streamed.
+
+    CSV input starts with a header row. Records carry `username` and either `password`
+    or a pre-hashed `password_hash`, and optionally an existing TOTP secret in `gauth`.
+    """
+
+    def __init__(self, fmt: ImportFormat) -> None:
+        self.fmt = fmt
+        self.header: list[str] | None = None
+
+    def feed(self, line: str) -> dict | None:
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            return None
+        if self.fmt is ImportFormat.NDJSON:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Expected a JSON object per line")
+            return record
+        row = next(csv.reader([line]))
+        if self.header is None:
+            self.header = [column.strip() for column in row]
+            return None
+        return dict(zip(self.header, row))
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+    started_at: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def rate(self) -> float:
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "read": self.read,
+            "inserted": self.inserted,
+            "skipped": self.skipped,
+            "invalid": self.invalid,
+            "batches": self.batches,
+            "elapsed": self.elapsed,
+            "rate": self.rate,
+        }
+
+
+class UserImporter:
+    """Bulk-loads users from CSV or NDJSON lines.
+
+    Records are grouped into batches. Plain passwords in a batch are hashed in one chunk
+    per worker, and the batch is written with a single executemany INSERT that skips
+    usernames which already exist. `skipped` counts those, `invalid` counts records that
+    could not be parsed, lack a username or password, or carry a `gauth` that is not
+    base32. Concurrent imports share the hashing pool and queue for it.
+    """
+
+    pool = WorkerPool(
+        kind=settings.IMPORT_POOL_KIND,  # type: ignore
+        max_workers=settings.IMPORT_POOL_WORKERS,
+        max_pending=settings.IMPORT_POOL_WORKERS,
+    )
+    user_repository = UserRepository()
+
+    def __init__(
+        self,
+        db_session: DBManager,
+        batch_size: int = settings.IMPORT_BATCH_SIZE,
+        on_progress: Callable[[ImportStats], None] | None = None,
+        pool: WorkerPool | None = None,
+    ) -> None:
+        self.db_session = db_session
+        self.batch_size = max(batch_size, 1)
+        self.on_progress = on_progress
+        self.pool = pool or self.pool
+        self.stats = ImportStats()
+
+    @staticmethod
+    def prepare(record: dict) -> tuple[dict, bool] | None:
+        username = str(record.get("username") or "").strip()
+        password = record.get("password")
+        password_hash = record.get("password_hash")
+        if not username or bool(password) == bool(password_hash):
+            return None
+        if password_hash and not PasswordHandler.is_hash(str(password_hash)):
+            return None
+        gauth = record.get("gauth")
+        if gauth and not is_base32_secret(str(gauth)):
+            return None
+        row = {
+            "id": uuid.uuid4(),
+            "username": username,
+            "username_normalized": normalize_username(username),
+            "password": str(password_hash or password),
+            "gauth": str(gauth or random_base32()),
+        }
+        return row, not password_hash
+
+    async def hash_passwords(self, batch: list[dict], plain: list[int]) -> None:
+        if not plain:
+            return
+        size = math.ceil(len(plain) / self.pool.max_workers)
+        chunks = [plain[start : start + size] for start in range(0, len(plain), size)]
+        results = await asyncio.gather(
+            *(
+                self.pool.run_queued(
+                    _hash_many, PasswordHandler.pwd_config, [batch[i]["password"] for i in chunk]
+                )
+                for chunk in chunks
+            )
+        )
+        for chunk, hashes in zip(chunks, results):
+            for index, hashed in zip(chunk, hashes):
+                batch[index]["password"] = hashed
+
+    async def write_batch(self, batch: list[dict], plain: list[int]) -> None:
+        await self.hash_passwords(batch, plain)
+        inserted = await self.user_repository.bulk_create(batch, db_session=self.db_session)
+        self.stats.inserted += inserted
+        self.stats.skipped += len(batch) - inserted
+        self.stats.batches += 1
+        self.stats.elapsed = time.perf_counter() - self.stats.started_at
+        logger.info(
+            "Imported batch %d: %d read, %d inserted, %.0f rows/s",
+            self.stats.batches,
+            self.stats.read,
+            self.stats.inserted,
+            self.stats.rate,
+        )
+        if self.on_progress is not None:
+            self.on_progress(self.stats)
+
+    async def run(self, lines: AsyncIterable[str], fmt: ImportFormat) -> ImportStats:
+        parser = RecordParser(fmt)
+        batch: list[dict] = []
+        plain: list[int] = []
+        async for line in lines:
+            try:
+                record = parser.feed(line)
+            except ValueError:
+                self.stats.read += 1
+                self.stats.invalid += 1
+                continue
+            if record is None:
+                continue
+            self.stats.read += 1
+            prepared = self.prepare(record)
+            if prepared is None:
+                self.stats.invalid += 1
+                continue
+            row, needs_hash = prepared
+            if needs_hash:
+                plain.append(len(batch))
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                await self.write_batch(batch, plain)
+                batch, plain = [], []
+        if batch:
+            await self.write_batch(batch, plain)
+        self.stats.elapsed = time.perf_counter() - self.stats.started_at
+        return self.stats
+
+
+@dataclass
+class ImportJob:
+    fmt: ImportFormat
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "running"
+    stats: ImportStats = field(default_factory=ImportStats)
+    error: str | None = None
+
+    def as_dict(self) -> dict:
+        return {"id": self.id, "status": self.status, "error": self.error, **self.stats.as_dict()}
+
+
+class ImportJobs:
+    """Runs imports as background tasks in this process and keeps their progress.
+
+    Only the last `max_finished` finished jobs are kept for status lookups. Jobs that
+    are still running when the app shuts down are cancelled and marked as such.
+    """
+
+    def __init__(self, max_finished: int = 100) -> None:
+        self.max_finished = max_finished
+        self.jobs: OrderedDict[str, ImportJob] = OrderedDict()
+        self.tasks: dict[str, asyncio.Task] = {}
+
+    def get(self, job_id: str) -> ImportJob | None:
+        return self.jobs.get(job_id)
+
+    def start(self, importer: UserImporter, source: IO[bytes], fmt: ImportFormat) -> ImportJob:
+        job = ImportJob(fmt=fmt, stats=importer.stats)
+        self.jobs[job.id] = job
+        self.tasks[job.id] = asyncio.create_task(self._run(job, importer, source))
+        self._evict()
+        return job
+
+    async def _run(self, job: ImportJob, importer: UserImporter, source: IO[bytes]) -> None:
+        try:
+            await importer.run(iter_lines(read_chunks(source)), job.fmt)
+            job.status = "done"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as exc:
+            job.status = "failed"
+            job.error = str(exc)
+            logger.exception("User import %s failed", job.id)
+        finally:
+            source.close()
+            self.tasks.pop(job.id, None)
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id in self.jobs if job_id not in self.tasks]
+        for job_id in finished[: max(len(finished) - self.max_finished, 0)]:
+            del self.jobs[job_id]
+
+    async def shutdown(self) -> None:
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+import_jobs = ImportJobs()
@@ -5,12 +5,74 @@ class Settings(BaseSettings):
     port: int = 80
     ENVIRONMENT: str
     DATABASE_URL: str
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_REPLICA_STRATEGY: str = "round_robin"
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = -1
+    DB_POOL_PRE_PING: bool = False
     SECRET_KEY: str
     JWT_ALGORITHM: str
+    JWT_PRIVATE_KEYS: list[str] = []
+    JWT_PUBLIC_KEYS: list[str] = []
+    JWT_ACTIVE_KID: str | None = None
     JWT_EXPIRE_MINUTES: int = 900
     SESSION_EXPIRE_MINUTES: int = 24 * 60 * 30
+    SESSION_COOKIE_REFRESH_MINUTES: int = 24 * 60
+    JWT_CACHE_SIZE: int = 10000
+    CSRF_TOKEN_MODE: str = "jwt"
 
     REDIS_URL: str
+    REDIS_LOCAL_CACHE_ENABLED: bool = False
+    REDIS_LOCAL_CACHE_SIZE: int = 10000
+    REDIS_LOCAL_CACHE_TTL_SECONDS: float = 30
+    REDIS_LOCAL_CACHE_CHANNEL: str = "fast-auth:invalidate"
+    PROFILE_CACHE_TTL_SECONDS: int = 300
+
+    PASSWORD_POOL_KIND: str = "thread"
+    PASSWORD_POOL_WORKERS: int = 4
+    PASSWORD_POOL_MAX_PENDING: int = 64
+    # Pick with scripts/calibrate_bcrypt.py, or set BCRYPT_CALIBRATE_ON_STARTUP to tune
+    # each node in the background. Hashes below the cost are upgraded on login.
+    BCRYPT_ROUNDS: int | None = None
+    BCRYPT_TARGET_MS: float = 250
+    BCRYPT_CALIBRATE_ON_STARTUP: bool = False
+
+    QR_POOL_KIND: str = "thread"
+    QR_POOL_WORKERS: int = 2
+    QR_POOL_MAX_PENDING: int = 32
+    QR_CACHE_SIZE: int = 1024
+    QR_CACHE_TTL_SECONDS: int = 300
+
+    AUTH_TIMING_FLOOR_MS: int = 250
+    AUTH_TIMING_JITTER_MS: int = 50
+
+    METRICS_ENABLED: bool = True
+    # Requires the X-Admin-Key header; closed while ADMIN_API_KEY is unset.
+    METRICS_PATH: str = "/internal/metrics"
+    TRACING_ENABLED: bool = False
+    # "console", "memory" or "otlp" (OTLP over HTTP to a collector, for fleet-wide use).
+    TRACING_EXPORTER: str = "console"
+    TRACING_OTLP_ENDPOINT: str | None = None
+    TRACING_SERVICE_NAME: str = "fast-auth"
+
+    LOG_SINK: str = "none"
+    LOG_FILE_PATH: str = "requests.log"
+    LOG_HTTP_URL: str | None = None
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_BATCH_SIZE: int = 500
+    LOG_FLUSH_INTERVAL_SECONDS: float = 1.0
+    RESPONSE_LOG_SAMPLE_RATE: float = 0.0
+    # Bodies are only captured when this is above 0, and never under the paths below.
+    RESPONSE_LOG_MAX_BYTES: int = 0
+    RESPONSE_LOG_BODYLESS_PATHS: list[str] = ["/auth", "/admin"]
+
+    ADMIN_API_KEY: str | None = None
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_POOL_KIND: str = "process"
+    IMPORT_POOL_WORKERS: int = 4
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,65 @@
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from ..instrumentation import instrumentation
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.checkouts if self.checkouts else 0.0
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait and how often they time out.
+
+    Every checkout emits `db.pool.checkout` (and a timed-out one `db.pool.timeout`)
+    on the instrumentation hook, tagged with the pool's logging name.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    @property
+    def name(self) -> str:
+        return self.logging_name or "default"
+
+    def connect(self):  # type: ignore[override]
+        start_time = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            instrumentation.emit("db.pool.timeout", **self.snapshot())
+            raise
+        wait = time.perf_counter() - start_time
+        self.stats.checkouts += 1
+        self.stats.total_wait += wait
+        self.stats.max_wait = max(self.stats.max_wait, wait)
+        instrumentation.annotate(**{"db.pool": self.name, "db.pool.wait_ms": wait * 1000})
+        if instrumentation.active:
+            instrumentation.emit("db.pool.checkout", wait=wait, **self.snapshot())
+        return connection
+
+    def snapshot(self) -> dict:
+        return {
+            "pool": self.name,
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.stats.checkouts,
+            "timeouts": self.stats.timeouts,
+            "avg_wait": self.stats.avg_wait,
+            "max_wait": self.stats.max_wait,
+        }
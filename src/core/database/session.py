@@ -1,29 +1,114 @@
+import itertools
 import json
-from typing import Type
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Literal, Type
 
 from sqlalchemy import URL
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import QueuePool
 
 from ..config import settings
 from .base import SQLBase
 from .parser import JSONDecoder, JSONEncoder
+from .pool import InstrumentedQueuePool
+
+logger = logging.getLogger(__name__)
+
+ReplicaStrategy = Literal["round_robin", "least_busy"]
+
+# aiosqlite runs on NullPool (files) or StaticPool (:memory:), so queue sizing only
+# applies when a queue pool class is passed in explicitly.
+SQLITE_ENGINE_OPTIONS = {
+    "echo",
+    "echo_pool",
+    "json_serializer",
+    "json_deserializer",
+    "pool_logging_name",
+    "pool_pre_ping",
+    "pool_recycle",
+    "poolclass",
+}
+QUEUE_POOL_OPTIONS = {"pool_size", "max_overflow", "pool_timeout"}
+
+
+@dataclass
+class Replica:
+    engine: AsyncEngine
+    in_flight: int = 0
+    down_until: float = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+
+def engine_kwargs(
+    db_url: str | URL, prepared_statement_cache_size: int | None = None, **kwargs
+) -> dict:
+    if "sqlite" in str(db_url):
+        options = SQLITE_ENGINE_OPTIONS
+        poolclass = kwargs.get("poolclass")
+        if isinstance(poolclass, type) and issubclass(poolclass, QueuePool):
+            options = options | QUEUE_POOL_OPTIONS
+        return {key: value for key, value in kwargs.items() if key in options}
+
+    kwargs.setdefault("poolclass", InstrumentedQueuePool)
+    if "asyncpg" in str(db_url) and prepared_statement_cache_size is not None:
+        # Per-connection LRU of asyncpg prepared statements, keyed by the SQL string
+        # SQLAlchemy compiled; 0 disables it (e.g. behind pgbouncer in transaction mode).
+        kwargs["connect_args"] = {
+            **kwargs.get("connect_args", {}),
+            "prepared_statement_cache_size": prepared_statement_cache_size,
+        }
+    return kwargs
 
 
 class DBManager:
     def __init__(
-        self, model_base: Type[DeclarativeBase], db_url: str | URL, **kwargs  # type: ignore
+        self,
+        model_base: Type[DeclarativeBase],
+        db_url: str | URL,
+        prepared_statement_cache_size: int | None = None,
+        replica_urls: list[str] | None = None,
+        replica_strategy: ReplicaStrategy = "round_robin",
+        replica_retry_after: float = 5.0,
+        **kwargs,  # type: ignore
     ) -> None:
         self.model_base = model_base
         self.db_url = db_url
-
-        if "sqlite" in db_url:
-            kwargs = {}
+        self.replica_strategy = replica_strategy
+        self.replica_retry_after = replica_retry_after
 
         self.engine = create_async_engine(
             db_url,
-            **kwargs,
+            **engine_kwargs(
+                db_url, prepared_statement_cache_size, **{"pool_logging_name": "primary", **kwargs}
+            ),
         )
+        self.replicas = [
+            Replica(
+                create_async_engine(
+                    url,
+                    **engine_kwargs(
+                        url,
+                        prepared_statement_cache_size,
+                        **{"pool_logging_name": f"replica-{index}", **kwargs},
+                    ),
+                )
+            )
+            for index, url in enumerate(replica_urls or [])
+        ]
+        self._replica_cycle = itertools.count()
 
         self.sessionmaker = async_sessionmaker(
             self.engine,
@@ -50,12 +135,73 @@ class DBManager:
     def begin(self):
         return self.sessionmaker.begin()
 
+    def pick_replica(self) -> Replica | None:
+        replicas = [replica for replica in self.replicas if replica.available]
+        if not replicas:
+            return None
+        if self.replica_strategy == "least_busy":
+            return min(replicas, key=lambda replica: replica.in_flight)
+        return replicas[next(self._replica_cycle) % len(replicas)]
+
+    async def _connect_replica(self, replica: Replica) -> AsyncConnection | None:
+        try:
+            return await replica.engine.connect()
+        except (DBAPIError, OSError):
+            logger.warning("Read replica %s is unavailable", replica.engine.url, exc_info=True)
+            replica.down_until = time.monotonic() + self.replica_retry_after
+            return None
+
+    @asynccontextmanager
+    async def read(self, primary: bool = False) -> AsyncIterator[AsyncConnection]:
+        """Plain connection for single SELECTs, skipping the ORM session entirely.
+
+        Reads go to a replica when any are configured and reachable, and to the primary
+        otherwise or when `primary` is set (read-after-write). The transaction is
+        read-only where the dialect supports it and is rolled back on exit, so nothing
+        executed here can write.
+        """
+        replica = None if primary else self.pick_replica()
+        conn = await self._connect_replica(replica) if replica else None
+        if conn is None:
+            replica = None
+            conn = await self.engine.connect()
+
+        if replica:
+            replica.in_flight += 1
+        try:
+            if conn.dialect.name == "postgresql":
+                conn = await conn.execution_options(postgresql_readonly=True)
+            yield conn
+        finally:
+            await conn.close()
+            if replica:
+                replica.in_flight -= 1
+
+    def pool_stats(self) -> list[dict]:
+        engines = [self.engine] + [replica.engine for replica in self.replicas]
+        return [
+            engine.pool.snapshot()
+            for engine in engines
+            if isinstance(engine.pool, InstrumentedQueuePool)
+        ]
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
 
 SQL_DB = DBManager(
     model_base=SQLBase,
     db_url=settings.DATABASE_URL,
-    pool_size=10,
-    max_overflow=20,
+    prepared_statement_cache_size=settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    replica_urls=settings.DATABASE_REPLICA_URLS,
+    replica_strategy=settings.DATABASE_REPLICA_STRATEGY,  # type: ignore
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
     json_serializer=lambda data: json.dumps(data, cls=JSONEncoder),  # type: ignore
     json_deserializer=lambda data: json.loads(data, cls=JSONDecoder),  # type: ignore
 )
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Literal
+
+from .exceptions import ServiceUnavailableException
+
+PoolKind = Literal["thread", "process"]
+
+
+class WorkerPoolFullError(ServiceUnavailableException):
+    message = "Server is busy, please try again later"
+
+
+@dataclass
+class WorkerPoolStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    pending: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        finished = self.completed + self.failed
+        return self.total_latency / finished if finished else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "pending": self.pending,
+            "avg_latency": self.avg_latency,
+            "max_latency": self.max_latency,
+        }
+
+
+class WorkerPool:
+    """Runs blocking callables off the event loop with a bounded backlog.
+
+    `pending` counts every job that was submitted but has not finished yet, so it is
+    the queue depth plus the jobs currently running. Once it reaches `max_pending` new
+    jobs are rejected instead of queueing up behind a burst.
+    """
+
+    def __init__(self, kind: PoolKind = "thread", max_workers: int = 4, max_pending: int = 64):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.stats = WorkerPoolStats()
+        self._executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="worker-pool"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.stats.pending >= self.max_pending:
+            self.stats.rejected += 1
+            raise WorkerPoolFullError
+
+        loop = asyncio.get_running_loop()
+        self.stats.submitted += 1
+        self.stats.pending += 1
+        start_time = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(self.executor, func, *args)
+        except BaseException:
+            self.stats.failed += 1
+            raise
+        else:
+            self.stats.completed += 1
+            return result
+        finally:
+            latency = time.perf_counter() - start_time
+            self.stats.pending -= 1
+            self.stats.total_latency += latency
+            self.stats.max_latency = max(self.stats.max_latency, latency)
+
+    async def run_queued(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Like `run`, but waits for a free slot instead of being rejected.
+
+        For batch work such as imports, where callers would rather queue than fail.
+        Only waits for other `run_queued` callers, so a pool should not mix both.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            return await self.run(func, *args)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
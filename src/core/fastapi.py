@@ -1,19 +1,37 @@
+import asyncio
+import logging
 from typing import List
 
 from asyncpg.exceptions._base import PostgresError  # type: ignore
 from fastapi import Depends, FastAPI, Request
 from fastapi.middleware import Middleware
 from fastapi.openapi.utils import get_openapi
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy.exc import IntegrityError
 
+from src.controllers.user_import import UserImporter, import_jobs
+from src.core.database import SQL_DB
 from src.core.exceptions import CustomException
+from src.core.redis.client import RedisManager
+from src.depends import require_admin_key
+from src.repository.password import PasswordHandler
+from src.repository.qr_code import QRCodeHandler
 from src.routers import routers
 
 from .config import settings
 from .exceptions import BadRequestException
-from .logging import Logging
-from .middleware import ResponseLoggerMiddleware, SessionMiddleware
+from .instrumentation import instrumentation
+from .logging import Logging, log_shipper
+from .metrics import record_event, registry
+from .middleware import (
+    MetricsMiddleware,
+    ResponseLoggerMiddleware,
+    SessionMiddleware,
+    TracingMiddleware,
+)
+from .tracing import build_exporter, configure_tracing, shutdown_tracing
+
+logger = logging.getLogger(__name__)
 
 
 def custom_openapi():
@@ -71,14 +89,129 @@ async def sqlalchemy_unique_constraint(request, exc: IntegrityError):
 
 
 def make_middleware() -> List[Middleware]:
-    middleware = [Middleware(ResponseLoggerMiddleware), Middleware(SessionMiddleware)]
+    middleware = [
+        Middleware(TracingMiddleware),
+        Middleware(ResponseLoggerMiddleware),
+        Middleware(SessionMiddleware),
+    ]
+    if settings.METRICS_ENABLED:
+        middleware.insert(0, Middleware(MetricsMiddleware))
     return middleware
 
 
+def db_pool_samples(key: str):
+    return [((stats["pool"],), stats[key]) for stats in SQL_DB.pool_stats()]
+
+
+WORKER_POOLS = {
+    "password": PasswordHandler.pool,
+    "qr_code": QRCodeHandler.pool,
+    "user_import": UserImporter.pool,
+}
+
+registry.callback(
+    "db_pool_size", "Configured DB pool size", ["pool"], lambda: db_pool_samples("size")
+)
+registry.callback(
+    "db_pool_checked_out",
+    "DB connections currently checked out",
+    ["pool"],
+    lambda: db_pool_samples("checked_out"),
+)
+registry.callback(
+    "db_pool_overflow",
+    "DB connections open beyond the pool size",
+    ["pool"],
+    lambda: db_pool_samples("overflow"),
+)
+registry.callback(
+    "worker_pool_pending",
+    "Jobs submitted to a worker pool and not finished yet",
+    ["pool"],
+    lambda: [((name,), pool.stats.pending) for name, pool in WORKER_POOLS.items()],
+)
+registry.callback(
+    "worker_pool_rejected_total",
+    "Jobs rejected because a worker pool's backlog was full",
+    ["pool"],
+    lambda: [((name,), pool.stats.rejected) for name, pool in WORKER_POOLS.items()],
+    kind="counter",
+)
+registry.callback(
+    "log_shipper_dropped_total",
+    "Log records dropped because the shipping queue was full",
+    [],
+    lambda: [((), log_shipper.stats.dropped)],
+    kind="counter",
+)
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    # Same X-Admin-Key guard as the admin API, so the endpoint stays closed until
+    # ADMIN_API_KEY is set.
+    await require_admin_key(request.headers.get("X-Admin-Key"))
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+def init_metrics(app_: FastAPI) -> FastAPI:
+    if settings.METRICS_ENABLED:
+        instrumentation.subscribe(record_event)
+        # A plain route, so scrapes skip the app dependencies (request log shipping).
+        app_.add_route(settings.METRICS_PATH, metrics_endpoint, include_in_schema=False)
+    return app_
+
+
 async def custom_exception_handler(request: Request, exc: CustomException):  # type: ignore
     return JSONResponse(status_code=exc.code, content={"error": exc.message})
 
 
+class PasswordCalibration:
+    """Calibrates bcrypt in the background, so startup does not wait for it.
+
+    Until it finishes, hashing uses BCRYPT_ROUNDS (or passlib's default).
+    """
+
+    task: asyncio.Task | None = None
+
+    @staticmethod
+    async def _run() -> None:
+        try:
+            rounds = await PasswordHandler.calibrate(settings.BCRYPT_TARGET_MS)
+        except Exception:
+            logger.exception("bcrypt calibration failed, keeping the configured cost")
+        else:
+            logger.info("bcrypt calibrated to %d rounds", rounds)
+
+    @staticmethod
+    async def start() -> None:
+        if settings.BCRYPT_CALIBRATE_ON_STARTUP and PasswordCalibration.task is None:
+            PasswordCalibration.task = asyncio.create_task(PasswordCalibration._run())
+
+    @staticmethod
+    async def stop() -> None:
+        task, PasswordCalibration.task = PasswordCalibration.task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+async def start_redis_local_cache() -> None:
+    if RedisManager.local_cache is not None:
+        await RedisManager.local_cache.start(RedisManager().redis)
+
+
+async def stop_redis_local_cache() -> None:
+    if RedisManager.local_cache is not None:
+        await RedisManager.local_cache.stop()
+
+
+def init_tracing(app_: FastAPI) -> FastAPI:
+    if settings.TRACING_ENABLED:
+        provider = configure_tracing(build_exporter(settings.TRACING_EXPORTER))
+        app_.add_event_handler("shutdown", lambda: shutdown_tracing(provider))
+    return app_
+
+
 def create_app() -> FastAPI:
     app_ = FastAPI(
         title="Fairtobot Backend",
@@ -90,9 +223,21 @@ def create_app() -> FastAPI:
         middleware=make_middleware(),
     )
     app_ = init_routers(app_=app_)
+    app_ = init_metrics(app_=app_)
+    app_ = init_tracing(app_=app_)
     app_.add_exception_handler(CustomException, custom_exception_handler)
     app_.add_exception_handler(PostgresError, postgres_exception_handler)
     app_.add_exception_handler(IntegrityError, sqlalchemy_unique_constraint)
+    app_.add_event_handler("startup", PasswordCalibration.start)
+    app_.add_event_handler("startup", start_redis_local_cache)
+    app_.add_event_handler("startup", log_shipper.start)
+    app_.add_event_handler("shutdown", stop_redis_local_cache)
+    app_.add_event_handler("shutdown", log_shipper.stop)
+    app_.add_event_handler("shutdown", PasswordCalibration.stop)
+    app_.add_event_handler("shutdown", PasswordHandler.pool.shutdown)
+    app_.add_event_handler("shutdown", QRCodeHandler.pool.shutdown)
+    app_.add_event_handler("shutdown", import_jobs.shutdown)
+    app_.add_event_handler("shutdown", UserImporter.pool.shutdown)
     app_.openapi = custom_openapi
     return app_
 
@@ -0,0 +1,121 @@
+import asyncio
+import contextlib
+import functools
+import logging
+import time
+from typing import Any, Callable, Iterator, TypeVar
+
+from opentelemetry import trace
+
+logger = logging.getLogger(__name__)
+
+Subscriber = Callable[[str, dict[str, Any]], None]
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Instrumentation:
+    """Fan-out point for runtime measurements.
+
+    Components call `emit` with a dotted event name and plain keyword data, and
+    whatever exporters are installed subscribe to receive them. With no subscribers
+    emitting is a no-op, and a failing subscriber is logged instead of breaking the
+    code that emitted. Setting `tracer` (see `core.tracing`) also runs operations in
+    OpenTelemetry spans.
+    """
+
+    def __init__(self) -> None:
+        self.subscribers: list[Subscriber] = []
+        self.tracer: trace.Tracer | None = None
+
+    @property
+    def active(self) -> bool:
+        return bool(self.subscribers)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.subscribers) or self.tracer is not None
+
+    def subscribe(self, callback: Subscriber) -> Subscriber:
+        if callback not in self.subscribers:
+            self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Subscriber) -> None:
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def emit(self, event: str, **data: Any) -> None:
+        for callback in self.subscribers:
+            try:
+                callback(event, data)
+            except Exception:
+                logger.exception("Instrumentation subscriber failed for %s", event)
+
+    @contextlib.contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        """Times the block and, when tracing is on, runs it in a span called `name`.
+
+        Emits an `operation` event with `name`, `duration` in seconds and `error`
+        (whether the block raised).
+        """
+        span = (
+            self.tracer.start_as_current_span(name)
+            if self.tracer is not None
+            else contextlib.nullcontext()
+        )
+        start_time = time.perf_counter()
+        error = True
+        with span:
+            try:
+                yield
+                error = False
+            finally:
+                if self.subscribers:
+                    self.emit(
+                        "operation",
+                        name=name,
+                        duration=time.perf_counter() - start_time,
+                        error=error,
+                    )
+
+    def annotate(self, **attributes: Any) -> None:
+        """Sets attributes (cache hits, pool wait, ...) on the current span, if any."""
+        if self.tracer is None:
+            return
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes(attributes)
+
+
+instrumentation = Instrumentation()
+
+
+def instrumented(name: str) -> Callable[[F], F]:
+    """Runs every call of the decorated function or coroutine function as an operation.
+
+    See `Instrumentation.operation`. While nothing is subscribed and tracing is off
+    the wrapper only checks a flag.
+    """
+
+    def decorator(func: F) -> F:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not instrumentation.enabled:
+                    return await func(*args, **kwargs)
+                with instrumentation.operation(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not instrumentation.enabled:
+                return func(*args, **kwargs)
+            with instrumentation.operation(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
@@ -1,9 +1,224 @@
-from fastapi import BackgroundTasks
+import asyncio
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+import httpx
+from fastapi import Request
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LogSink(Protocol):
+    async def write(self, records: list[dict]) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+def _dumps(records: list[dict]) -> str:
+    return "".join(json.dumps(record, default=str) + "\n" for record in records)
+
+
+class StdoutJSONSink:
+    async def write(self, records: list[dict]) -> None:
+        sys.stdout.write(_dumps(records))
+        sys.stdout.flush()
+
+    async def close(self) -> None:
+        ...
+
+
+class FileSink:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def _append(self, data: str) -> None:
+        with self.path.open("a", encoding="utf-8") as file:
+            file.write(data)
+
+    async def write(self, records: list[dict]) -> None:
+        await asyncio.to_thread(self._append, _dumps(records))
+
+    async def close(self) -> None:
+        ...
+
+
+class HTTPSink:
+    """POSTs each batch as a JSON array, e.g. to a log collector's ingest endpoint."""
+
+    def __init__(self, url: str, client: httpx.AsyncClient | None = None) -> None:
+        self.url = url
+        self.client = client or httpx.AsyncClient(timeout=5)
+
+    async def write(self, records: list[dict]) -> None:
+        response = await self.client.post(
+            self.url,
+            content=json.dumps(records, default=str),
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def build_sink(kind: str) -> LogSink | None:
+    if kind == "stdout":
+        return StdoutJSONSink()
+    if kind == "file":
+        return FileSink(settings.LOG_FILE_PATH)
+    if kind == "http":
+        if not settings.LOG_HTTP_URL:
+            raise ValueError("LOG_HTTP_URL is required for the http log sink")
+        return HTTPSink(settings.LOG_HTTP_URL)
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown log sink: {kind}")
+
+
+@dataclass
+class LogShipperStats:
+    shipped: int = 0
+    dropped: int = 0
+    failed: int = 0
+    batches: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "shipped": self.shipped,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+class LogShipper:
+    """Ships log records from request handlers to a sink without blocking them.
+
+    `ship` only puts the record on a bounded queue; when the queue is full the record
+    is dropped and counted. A single drainer task sends records to the sink in batches
+    of up to `batch_size`, or whatever arrived within `flush_interval` seconds of the
+    first record in the batch. With no sink, shipping is a no-op.
+    """
+
+    def __init__(
+        self,
+        sink: LogSink | None,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_queue)
+        self.stats = LogShipperStats()
+        self._batch: list[dict] = []
+        self._drainer: asyncio.Task | None = None
+        self._in_flight: asyncio.Future | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.sink is not None
+
+    def ship(self, record: dict) -> None:
+        if self.sink is None:
+            return
+        try:
+            self.queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+
+    async def start(self) -> None:
+        if self.sink is not None and self._drainer is None:
+            self._drainer = asyncio.create_task(self._drain())
+
+    async def stop(self) -> None:
+        if self._drainer is not None:
+            self._drainer.cancel()
+            try:
+                await self._drainer
+            except asyncio.CancelledError:
+                pass
+            self._drainer = None
+        if self._in_flight is not None:
+            # Cancelling the drainer does not cancel a write it already started.
+            await self._in_flight
+            self._in_flight = None
+        if self.sink is not None:
+            batch, self._batch = self._batch, []
+            await self.flush(batch)
+            while not self.queue.empty():
+                await self.flush(self._take(self.batch_size))
+            await self.sink.close()
+
+    def _take(self, limit: int) -> list[dict]:
+        batch: list[dict] = []
+        while len(batch) < limit and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def flush(self, batch: list[dict]) -> None:
+        if not batch or self.sink is None:
+            return
+        try:
+            await self.sink.write(batch)
+        except Exception:
+            self.stats.failed += len(batch)
+            logger.exception("Failed to ship %d log records", len(batch))
+        else:
+            self.stats.shipped += len(batch)
+        self.stats.batches += 1
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Kept on the shipper so `stop` can flush a batch that was still filling up.
+            self._batch = [await self.queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(self._batch) < self.batch_size:
+                self._batch.extend(self._take(self.batch_size - len(self._batch)))
+                timeout = deadline - loop.time()
+                if len(self._batch) >= self.batch_size or timeout <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            batch, self._batch = self._batch, []
+            # Shielded so `stop` cancelling the drainer mid-write waits for the batch
+            # instead of losing it.
+            self._in_flight = asyncio.ensure_future(self.flush(batch))
+            await asyncio.shield(self._in_flight)
+            self._in_flight = None
+
+
+log_shipper = LogShipper(
+    build_sink(settings.LOG_SINK),
+    max_queue=settings.LOG_QUEUE_SIZE,
+    batch_size=settings.LOG_BATCH_SIZE,
+    flush_interval=settings.LOG_FLUSH_INTERVAL_SECONDS,
+)
 
 
 class Logging:
-    def __init__(self, background_task: BackgroundTasks):
-        background_task.add_task(self._send_log)
+    def __init__(self, request: Request):
+        if log_shipper.enabled:
+            log_shipper.ship(self.record(request))
 
-    async def _send_log(self):
-        pass
+    @staticmethod
+    def record(request: Request) -> dict[str, Any]:
+        return {
+            "time": time.time(),
+            "method": request.method,
+            "path": request.url.path,
+            "client": request.client.host if request.client else None,
+        }
@@ -1,4 +1,11 @@
+from .metrics import MetricsMiddleware
 from .response_logger import ResponseLoggerMiddleware
 from .session import SessionMiddleware
+from .tracing import TracingMiddleware
 
-__all__ = ["ResponseLoggerMiddleware", "SessionMiddleware"]
+__all__ = [
+    "MetricsMiddleware",
+    "ResponseLoggerMiddleware",
+    "SessionMiddleware",
+    "TracingMiddleware",
+]
@@ -0,0 +1,39 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.metrics import http_request_duration, http_requests
+
+
+class MetricsMiddleware:
+    """Records latency and status per route template (e.g. `/auth/login`).
+
+    The route is read from `scope["route"]` after the app ran, so paths with ids in
+    them do not create a label per request; unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start_time = time.perf_counter()
+        status = 500
+
+        async def _metrics_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _metrics_send)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            http_request_duration.observe(
+                time.perf_counter() - start_time, scope["method"], path
+            )
+            http_requests.inc(scope["method"], path, str(status))
@@ -1,37 +1,146 @@
-from typing import Optional
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable
 
-from pydantic import BaseModel, Field
 from starlette.datastructures import Headers
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from src.core.config import settings
 
-class ResponseInfo(BaseModel):
-    headers: Optional[Headers] = Field(default=None, title="Response header")
-    body: str = Field(default="", title="Response Body")
-    status_code: Optional[int] = Field(default=None, title="Status code")
+logger = logging.getLogger(__name__)
 
-    class Config:
-        arbitrary_types_allowed = True
+REDACTED = "[redacted]"
+SENSITIVE_HEADERS = {"set-cookie", "x-csrf-token", "authorization", "cookie"}
+SENSITIVE_FIELDS = {
+    "password",
+    "gauth",
+    "provisioning_uri",
+    "qr_img",
+    "access_token",
+    "refresh_token",
+    "csrf_token",
+}
+
+
+def redact_headers(raw_headers: list[tuple[bytes, bytes]]) -> Headers:
+    return Headers(
+        raw=[
+            (name, REDACTED.encode() if name.lower().decode() in SENSITIVE_HEADERS else value)
+            for name, value in raw_headers
+        ]
+    )
+
+
+def _redact_fields(value):
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in SENSITIVE_FIELDS else _redact_fields(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact_fields(item) for item in value]
+    return value
+
+
+def redact_body(body: bytes, headers: Headers | None) -> bytes:
+    """Redact secret fields of a JSON body; other bodies are kept as they are.
+
+    A JSON body that does not parse (e.g. because it was truncated) is dropped, since
+    its secret fields cannot be found.
+    """
+    if headers is None or "json" not in headers.get("content-type", ""):
+        return body
+    try:
+        return json.dumps(_redact_fields(json.loads(body))).encode()
+    except ValueError:
+        return b""
+
+
+@dataclass
+class ResponseInfo:
+    method: str
+    path: str
+    status_code: int | None = None
+    headers: Headers | None = None
+    body: bytearray = field(default_factory=bytearray)
+    size: int = 0
+    duration: float = 0.0
+
+    @property
+    def truncated(self) -> bool:
+        return self.size > len(self.body)
+
+
+ResponseSink = Callable[[ResponseInfo], None]
+
+
+def log_sink(response_info: ResponseInfo) -> None:
+    logger.info(
+        "%s %s -> %s (%d bytes, %.1f ms)",
+        response_info.method,
+        response_info.path,
+        response_info.status_code,
+        response_info.size,
+        response_info.duration * 1000,
+    )
 
 
 class ResponseLoggerMiddleware:
-    def __init__(self, app: ASGIApp) -> None:
+    """Captures a sample of responses, keeping at most `max_body_bytes` of each raw body.
+
+    Requests that are not sampled are passed straight through. A captured response is
+    handed to `sink` after its last body chunk has been sent; the sink runs inline, so
+    it should only hand the record off. Credential headers are always redacted; bodies
+    are not captured under `bodyless_paths` and have their secret JSON fields redacted
+    elsewhere.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = settings.RESPONSE_LOG_SAMPLE_RATE,
+        max_body_bytes: int = settings.RESPONSE_LOG_MAX_BYTES,
+        sink: ResponseSink = log_sink,
+        bodyless_paths: list[str] = settings.RESPONSE_LOG_BODYLESS_PATHS,
+    ) -> None:
         self.app = app
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+        self.sink = sink
+        self.bodyless_paths = tuple(bodyless_paths)
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
-        if scope["type"] != "http":
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
             return await self.app(scope, receive, send)
 
-        response_info = ResponseInfo()
+        response_info = ResponseInfo(method=scope["method"], path=scope["path"])
+        max_body_bytes = 0 if scope["path"].startswith(self.bodyless_paths) else self.max_body_bytes
+        start_time = time.perf_counter()
 
         async def _logging_send(message: Message) -> None:
-            if message.get("type") == "http.response.start":
-                response_info.headers = Headers(raw=message.get("headers"))
-                response_info.status_code = message.get("status")
-            elif message.get("type") == "http.response.body":
-                if body := message.get("body"):
-                    response_info.body += body.decode("utf8")
-
             await send(message)
 
+            if message["type"] == "http.response.start":
+                response_info.headers = redact_headers(message.get("headers", []))
+                response_info.status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                response_info.size += len(body)
+                room = max_body_bytes - len(response_info.body)
+                if room > 0:
+                    response_info.body += body[:room]
+                if not message.get("more_body", False):
+                    response_info.duration = time.perf_counter() - start_time
+                    if response_info.body:
+                        response_info.body = bytearray(
+                            redact_body(response_info.body, response_info.headers)
+                        )
+                    try:
+                        self.sink(response_info)
+                    except Exception:
+                        logger.exception("Response log sink failed")
+
         await self.app(scope, receive, _logging_send)
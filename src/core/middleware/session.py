@@ -1,29 +1,78 @@
+import re
+import time
 from secrets import token_hex
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from src.core.config import settings
 
+SESSION_COOKIE = "Session-Id"
+SESSION_ID_PATTERN = re.compile(r"[0-9a-zA-Z_-]{1,64}")
 
-class SessionMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
+
+def read_cookie(scope: Scope, name: str) -> str | None:
+    prefix = name + "="
+    for key, value in scope["headers"]:
+        if key != b"cookie":
+            continue
+        for cookie in value.decode("latin-1").split(";"):
+            cookie = cookie.strip()
+            if cookie.startswith(prefix):
+                return cookie[len(prefix) :]
+    return None
+
+
+def parse_session_cookie(value: str | None) -> tuple[str | None, int | None]:
+    """Splits a `<session id>.<issued at>` cookie; older cookies carry only the id."""
+    if not value:
+        return None, None
+    session_id, _, issued_at = value.partition(".")
+    if not SESSION_ID_PATTERN.fullmatch(session_id):
+        return None, None
+    return session_id, int(issued_at) if issued_at.isdigit() else None
+
+
+class SessionMiddleware:
+    """Gives every client a `Session-Id` cookie and exposes it as `request.state.session_id`.
+
+    The cookie records when it was issued, so `Set-Cookie` is only sent when a new id
+    is minted or when less than `refresh_before` seconds of the cookie's lifetime remain.
+    """
+
+    def __init__(
         self,
-        request: Request,
-        call_next: RequestResponseEndpoint,
-        settings=settings,
-    ) -> Response:
-        session_id = request.cookies.get("Session-Id")
+        app: ASGIApp,
+        max_age: int = settings.SESSION_EXPIRE_MINUTES * 60,
+        refresh_before: int = settings.SESSION_COOKIE_REFRESH_MINUTES * 60,
+    ) -> None:
+        self.app = app
+        self.max_age = max_age
+        self.refresh_before = refresh_before
+
+    def cookie_header(self, session_id: str, issued_at: int) -> bytes:
+        return (
+            f"{SESSION_COOKIE}={session_id}.{issued_at}; HttpOnly; Max-Age={self.max_age}; "
+            "Path=/; SameSite=strict"
+        ).encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
 
-        if not session_id:
+        session_id, issued_at = parse_session_cookie(read_cookie(scope, SESSION_COOKIE))
+        now = int(time.time())
+        fresh = issued_at is not None and now - issued_at < self.max_age - self.refresh_before
+        if session_id is None:
             session_id = token_hex(16)
+        scope.setdefault("state", {})["session_id"] = session_id
+        if fresh:
+            return await self.app(scope, receive, send)
+
+        cookie = self.cookie_header(session_id, now)
+
+        async def _send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie)]
+            await send(message)
 
-        response = await call_next(request)
-        response.set_cookie(
-            "Session-Id",
-            session_id,
-            max_age=(settings.SESSION_EXPIRE_MINUTES) * 60,
-            httponly=True,
-            samesite="strict",
-        )
-        return response
+        await self.app(scope, receive, _send_with_cookie)
@@ -0,0 +1,42 @@
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.instrumentation import instrumentation
+
+
+class TracingMiddleware:
+    """Opens a server span per request while tracing is configured.
+
+    The span is renamed to the matched route template once routing has run, so
+    operations traced further down (controller, repository, redis) nest under it.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        tracer = instrumentation.tracer
+        if tracer is None or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        with tracer.start_as_current_span(
+            method,
+            kind=SpanKind.SERVER,
+            attributes={"http.method": method, "http.target": scope["path"]},
+        ) as span:
+
+            async def _tracing_send(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, _tracing_send)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.update_name(f"{method} {route.path}")
+                    span.set_attribute("http.route", route.path)
@@ -1,16 +1,146 @@
+import base64
+import hashlib
+from enum import IntEnum
 from typing import Any
 from uuid import UUID
 
 from asyncpg.pgproto.pgproto import UUID as _UUID
 from redis.asyncio import ConnectionPool
-from redis.asyncio.client import Redis
+from redis.asyncio.client import Pipeline, Redis
+from redis.commands.core import AsyncScript
 
 from ..config import settings
+from ..instrumentation import instrumentation, instrumented
+from .local_cache import MISSING, LocalCache
 
 redis_connection_pool = ConnectionPool.from_url(url=settings.REDIS_URL, max_connections=100)
 
+# KEYS: old refresh token, new refresh token, session id. ARGV: user id the old token
+# was issued to. The old token is only consumed if it still belongs to that user and
+# the session was verified for them, and the new token inherits its remaining TTL.
+ROTATE_REFRESH_TOKEN_SCRIPT = """
+local user_id = redis.call("GET", KEYS[1])
+if not user_id or user_id ~= ARGV[1] then
+    return 0
+end
+if redis.call("GET", KEYS[3]) ~= user_id then
+    return -1
+end
+local ttl = redis.call("PTTL", KEYS[1])
+if ttl > 0 then
+    redis.call("SET", KEYS[2], user_id, "PX", ttl)
+else
+    redis.call("SET", KEYS[2], user_id)
+end
+redis.call("DEL", KEYS[1])
+return 1
+"""
+
+
+class RedisKey:
+    """Fixed-length, prefixed keys for session data.
+
+    Raw refresh tokens are a few hundred bytes each, so keys are a 128-bit digest of the
+    value under a per-kind prefix. That also makes every kind of key scannable and
+    measurable on its own.
+    """
+
+    REFRESH_TOKEN = "rt:"
+    SESSION = "sid:"
+    PROFILE = "me:"
+    DIGEST_SIZE = 16
+
+    @staticmethod
+    def digest(prefix: str, value: str) -> str:
+        digest = hashlib.blake2b(str(value).encode(), digest_size=RedisKey.DIGEST_SIZE)
+        return prefix + base64.urlsafe_b64encode(digest.digest()).rstrip(b"=").decode()
+
+    @staticmethod
+    def refresh_token(refresh_token: str) -> str:
+        return RedisKey.digest(RedisKey.REFRESH_TOKEN, refresh_token)
+
+    @staticmethod
+    def session(session_id: str) -> str:
+        return RedisKey.digest(RedisKey.SESSION, session_id)
+
+    @staticmethod
+    def profile(user_id: str) -> str:
+        # User ids are fixed-length UUIDs and not secret, so they are used as is.
+        return RedisKey.PROFILE + str(user_id)
+
+
+class RotationResult(IntEnum):
+    NOT_VERIFIED = -1
+    INVALID = 0
+    ROTATED = 1
+
+
+class RedisPipeline:
+    """Queues commands with RedisManager's serialization and sends them in one round trip.
+
+    Commands return the pipeline so they can be chained, and `execute` returns the
+    deserialized results in order. Used as an async context manager, it executes on
+    a clean exit.
+    """
+
+    def __init__(self, manager: "RedisManager", pipeline: Pipeline) -> None:
+        self.manager = manager
+        self.pipeline = pipeline
+        self.written: list[Any] = []
+
+    def get(self, name) -> "RedisPipeline":
+        self.pipeline.get(self.manager.serialize(name))
+        return self
+
+    def ttl(self, name) -> "RedisPipeline":
+        self.pipeline.ttl(self.manager.serialize(name))
+        return self
+
+    def set(self, name, value, ex: int) -> "RedisPipeline":
+        name = self.manager.serialize(name)
+        self.pipeline.set(name, self.manager.serialize(value), ex)
+        self.written.append(name)
+        return self
+
+    def delete(self, *names) -> "RedisPipeline":
+        names = [self.manager.serialize(name) for name in names]
+        self.pipeline.delete(*names)
+        self.written.extend(names)
+        return self
+
+    @instrumented("redis.pipeline")
+    async def execute(self) -> list[Any]:
+        async with self.pipeline as pipeline:
+            results = await pipeline.execute()
+        written, self.written = self.written, []
+        await self.manager.invalidate(*written)
+        return [self.manager.deserialize(result) for result in results]
+
+    async def __aenter__(self) -> "RedisPipeline":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            await self.execute()
+        else:
+            await self.pipeline.reset()
+
 
 class RedisManager:
+    rotate_refresh_token_script: AsyncScript | None = None
+    # Refresh tokens are never cached locally: rotation has to consume them in redis.
+    # Session ids are, for no longer than their remaining TTL in redis.
+    local_cache = (
+        LocalCache(
+            prefixes=[RedisKey.SESSION, RedisKey.PROFILE],
+            channel=settings.REDIS_LOCAL_CACHE_CHANNEL,
+            maxsize=settings.REDIS_LOCAL_CACHE_SIZE,
+            ttl=settings.REDIS_LOCAL_CACHE_TTL_SECONDS,
+        )
+        if settings.REDIS_LOCAL_CACHE_ENABLED
+        else None
+    )
+
     def __init__(self):
         self.redis = Redis(connection_pool=redis_connection_pool)
 
@@ -24,30 +154,110 @@ class RedisManager:
             data = data.decode("utf-8")
         return data
 
+    @instrumented("redis.ttl")
     async def ttl(self, name) -> Any:
         name = self.serialize(name)
         result: int = await self.redis.ttl(name)
         return result
 
+    @instrumented("redis.get")
     async def get(self, name) -> Any:
         name = self.serialize(name)
-        result: bytes | None | str = await self.redis.get(name)
-        result = self.deserialize(result)
-        return result
+        return (await self.mget(name))[0]
+
+    @instrumented("redis.mget")
+    async def mget(self, *names) -> list[Any]:
+        names = [self.serialize(name) for name in names]
+        results = [MISSING] * len(names)
+        generation = None
+        if self.local_cache is not None:
+            generation = self.local_cache.generation
+            results = [
+                self.local_cache.get(name) if self.local_cache.handles(name) else MISSING
+                for name in names
+            ]
+        missing = [index for index, result in enumerate(results) if result is MISSING]
+        instrumentation.annotate(
+            **{"redis.keys": len(names), "redis.local_cache_hits": len(names) - len(missing)}
+        )
+        if missing:
+            cacheable = (
+                [index for index in missing if self.local_cache.handles(names[index])]
+                if self.local_cache is not None and self.local_cache.subscribed
+                else []
+            )
+            fetched, ttls = await self._fetch(
+                [names[index] for index in missing], [names[index] for index in cacheable]
+            )
+            for index, result in zip(missing, fetched):
+                results[index] = self.deserialize(result)
+            for index, pttl in zip(cacheable, ttls):
+                # -1: no expiry in redis; -2: gone, which also means a None value.
+                remaining = None if pttl == -1 else pttl / 1000
+                self.local_cache.set(  # type: ignore[union-attr]
+                    names[index], results[index], generation, remaining_ttl=remaining
+                )
+        return results
 
+    async def _fetch(self, names: list, ttl_names: list) -> tuple[list, list[int]]:
+        """MGET `names`, plus the PTTL of each of `ttl_names` in the same round trip."""
+        if not ttl_names:
+            return await self.redis.mget(names), []
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            pipeline.mget(names)
+            for name in ttl_names:
+                pipeline.pttl(name)
+            fetched, *ttls = await pipeline.execute()
+        return fetched, ttls
+
+    @instrumented("redis.set")
     async def set(self, name, value, ex: int) -> Any:
         name = self.serialize(name)
         value = self.serialize(value)
         result = await self.redis.set(name, value, ex)
         result = self.deserialize(result)
+        await self.invalidate(name)
         return result
 
+    @instrumented("redis.delete")
     async def delete(self, name) -> Any:
         name = self.serialize(name)
         result = await self.redis.delete(name)
         result = self.deserialize(result)
+        await self.invalidate(name)
         return result
 
+    async def invalidate(self, *names) -> None:
+        if self.local_cache is not None:
+            await self.local_cache.publish(self.redis, names)
+
+    @instrumented("redis.rotate_refresh_token")
+    async def rotate_refresh_token(
+        self, old_refresh_token, refresh_token, session_id, user_id
+    ) -> RotationResult:
+        # Registering only hashes the script locally; it is sent with EVALSHA and loaded
+        # into redis on the first NOSCRIPT reply.
+        if RedisManager.rotate_refresh_token_script is None:
+            RedisManager.rotate_refresh_token_script = self.redis.register_script(
+                ROTATE_REFRESH_TOKEN_SCRIPT
+            )
+        result = await RedisManager.rotate_refresh_token_script(
+            keys=[
+                self.serialize(old_refresh_token),
+                self.serialize(refresh_token),
+                self.serialize(session_id),
+            ],
+            args=[self.serialize(user_id)],
+            client=self.redis,
+        )
+        return RotationResult(int(result))
+
+    def pipeline(self) -> RedisPipeline:
+        return RedisPipeline(self, self.redis.pipeline(transaction=False))
+
+    def transaction(self) -> RedisPipeline:
+        return RedisPipeline(self, self.redis.pipeline(transaction=True))
+
 
 def get_redis_db() -> RedisManager:
     return RedisManager()
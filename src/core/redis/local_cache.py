@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from typing import Any, Iterable
+
+from redis.asyncio.client import Redis
+
+from ..cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+class LocalCache:
+    """Process-local copy of hot redis keys, kept coherent through a pub/sub channel.
+
+    Only keys under `prefixes` are cached. Every write through RedisManager publishes
+    the written keys, and each process (including the writer) evicts them when the
+    message arrives. The TTL bounds staleness if a message is missed, and the whole
+    cache is dropped whenever the subscription has to reconnect.
+
+    Misses are never stored, and callers pass the key's remaining redis TTL so a local
+    copy never outlives the key it mirrors. A value fetched before an invalidation
+    arrived is not stored either: callers pass the `generation` they read before
+    fetching, and `set` skips the value if anything was invalidated since.
+    """
+
+    def __init__(
+        self,
+        prefixes: Iterable[str],
+        channel: str,
+        maxsize: int = 10000,
+        ttl: float = 30,
+        reconnect_delay: float = 1,
+    ) -> None:
+        self.prefixes = tuple(prefixes)
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.ttl = ttl
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Nothing is served from or stored in the cache unless invalidations can arrive.
+        self.subscribed = False
+        self.generation = 0
+        self._listener: asyncio.Task | None = None
+
+    def handles(self, key: Any) -> bool:
+        return isinstance(key, str) and key.startswith(self.prefixes)
+
+    def get(self, key: str) -> Any:
+        if not self.subscribed:
+            return MISSING
+        return self.cache.get(key, MISSING)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        generation: int | None = None,
+        remaining_ttl: float | None = None,
+    ) -> None:
+        if value is None or not self.subscribed:
+            return
+        if generation is not None and generation != self.generation:
+            return
+        if remaining_ttl is not None and remaining_ttl <= 0:
+            return
+        ttl = self.ttl if remaining_ttl is None else min(self.ttl, remaining_ttl)
+        self.cache.set(key, value, ttl=ttl)
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        self.generation += 1
+        for key in keys:
+            self.cache.delete(key)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.cache.clear()
+
+    async def publish(self, redis: Redis, keys: Iterable[str]) -> None:
+        keys = [key for key in keys if self.handles(key)]
+        if keys:
+            self.invalidate(keys)
+            await redis.publish(self.channel, "\n".join(keys))
+
+    def handle_message(self, message: dict | None) -> None:
+        if not message or message.get("type") != "message":
+            return
+        data = message["data"]
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        self.invalidate(data.split("\n"))
+
+    async def start(self, redis: Redis) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen(redis))
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self.subscribed = False
+        self.clear()
+
+    async def _listen(self, redis: Redis) -> None:
+        while True:
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    self.clear()
+                    self.subscribed = True
+                    async for message in pubsub.listen():
+                        self.handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Local cache invalidation listener failed, reconnecting")
+            finally:
+                self.subscribed = False
+                self.clear()
+            await asyncio.sleep(self.reconnect_delay)
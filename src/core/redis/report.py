@@ -0,0 +1,57 @@
+from collections import defaultdict
+from dataclasses import dataclass
+
+from redis.asyncio.client import Redis
+
+
+@dataclass
+class PrefixUsage:
+    prefix: str
+    sampled_keys: int = 0
+    sampled_bytes: int = 0
+    estimated_keys: float = 0.0
+    estimated_bytes: float = 0.0
+
+    @property
+    def avg_bytes(self) -> float:
+        return self.sampled_bytes / self.sampled_keys if self.sampled_keys else 0.0
+
+
+def key_prefix(key: bytes | str) -> str:
+    if isinstance(key, bytes):
+        key = key.decode("utf-8", errors="replace")
+    prefix, separator, _ = key.partition(":")
+    return prefix + separator if separator else "<none>"
+
+
+async def memory_by_prefix(redis: Redis, sample_size: int = 1000) -> list[PrefixUsage]:
+    """Estimate memory per key prefix from a random sample of the keyspace.
+
+    Uses two pipelined round trips (RANDOMKEY, then MEMORY USAGE) regardless of the
+    sample size, and scales the sample up by DBSIZE.
+    """
+    total_keys = await redis.dbsize()
+    if not total_keys:
+        return []
+
+    async with redis.pipeline(transaction=False) as pipeline:
+        for _ in range(min(sample_size, total_keys)):
+            pipeline.randomkey()
+        keys = [key for key in await pipeline.execute() if key is not None]
+    async with redis.pipeline(transaction=False) as pipeline:
+        for key in keys:
+            pipeline.memory_usage(key)
+        sizes = await pipeline.execute()
+
+    usage: dict[str, PrefixUsage] = defaultdict(lambda: PrefixUsage(prefix=""))
+    for key, size in zip(keys, sizes):
+        prefix = key_prefix(key)
+        usage[prefix].prefix = prefix
+        usage[prefix].sampled_keys += 1
+        usage[prefix].sampled_bytes += size or 0
+
+    scale = total_keys / len(keys) if keys else 0
+    for prefix_usage in usage.values():
+        prefix_usage.estimated_keys = prefix_usage.sampled_keys * scale
+        prefix_usage.estimated_bytes = prefix_usage.sampled_bytes * scale
+    return sorted(usage.values(), key=lambda item: item.estimated_bytes, reverse=True)
@@ -0,0 +1,55 @@
+import asyncio
+import random
+import time
+from typing import Any, Callable, Coroutine, Type
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from .instrumentation import instrumented
+
+
+class TimingEqualizer:
+    """Pads responses up to a floor (plus random jitter) measured from request start.
+
+    Use `route_class` on a router so the padding runs after the endpoint and its
+    dependencies have returned, instead of sleeping inside the endpoint while it still
+    holds database and redis handles. The floor only masks what is left over: handlers
+    should already do the same work on every branch.
+    """
+
+    _random = random.SystemRandom()
+
+    def __init__(self, floor: float, jitter: float = 0.0) -> None:
+        self.floor = floor
+        self.jitter = jitter
+        self.route_class = self._make_route_class()
+
+    def target(self) -> float:
+        if not self.jitter:
+            return self.floor
+        return self.floor + self._random.uniform(0, self.jitter)
+
+    @instrumented("auth.timing_pad")
+    async def pad(self, start_time: float) -> None:
+        remaining = self.target() - (time.perf_counter() - start_time)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    def _make_route_class(self) -> Type[APIRoute]:
+        equalizer = self
+
+        class EqualizedRoute(APIRoute):
+            def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+                route_handler = super().get_route_handler()
+
+                async def equalized_route_handler(request: Request) -> Response:
+                    start_time = time.perf_counter()
+                    try:
+                        return await route_handler(request)
+                    finally:
+                        await equalizer.pad(start_time)
+
+                return equalized_route_handler
+
+        return EqualizedRoute
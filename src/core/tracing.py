@@ -0,0 +1,57 @@
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SimpleSpanProcessor,
+    SpanExporter,
+)
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from .config import settings
+from .instrumentation import instrumentation
+
+
+def build_exporter(
+    kind: str, endpoint: str | None = settings.TRACING_OTLP_ENDPOINT
+) -> SpanExporter:
+    if kind == "console":
+        return ConsoleSpanExporter()
+    if kind == "memory":
+        return InMemorySpanExporter()
+    if kind == "otlp":
+        # Optional: only deployments that ship traces to a collector need the package.
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+        except ImportError as exception:
+            raise RuntimeError(
+                "TRACING_EXPORTER=otlp needs opentelemetry-exporter-otlp-proto-http installed"
+            ) from exception
+        # Without an endpoint the exporter falls back to OTEL_EXPORTER_OTLP_* variables.
+        return OTLPSpanExporter(endpoint=endpoint) if endpoint else OTLPSpanExporter()
+    raise ValueError(f"Unknown span exporter: {kind}")
+
+
+def configure_tracing(
+    exporter: SpanExporter, service_name: str = settings.TRACING_SERVICE_NAME
+) -> TracerProvider:
+    """Starts tracing instrumented operations and requests into `exporter`.
+
+    The provider is kept local instead of being installed as the global one, so tests
+    can configure and tear it down repeatedly. The in-memory exporter is fed
+    synchronously, every other exporter through a batching background thread.
+    """
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    if isinstance(exporter, InMemorySpanExporter):
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+    else:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    instrumentation.tracer = provider.get_tracer(__name__)
+    return provider
+
+
+def shutdown_tracing(provider: TracerProvider) -> None:
+    instrumentation.tracer = None
+    provider.shutdown()
@@ -1,9 +1,14 @@
-from fastapi import Depends, Request
+import hmac
+
+from fastapi import Depends, Header, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from .controllers.auth import AuthController
+from .core.config import settings
 from .core.database import DBManager, get_db
 from .core.exceptions import ForbiddenException
+from .core.redis.client import RedisManager, get_redis_db
+from .repository.csrf import CSRFHandler
 from .repository.jwt import JWTHandler
 
 http_bearer = HTTPBearer()
@@ -21,8 +26,7 @@ async def get_current_user(
     user_id = token.get("user_id")
     if not user_id:
         raise ForbiddenException("Invalid Access Token")
-    csrf_token = JWTHandler.decode(credentials.credentials)
-    if csrf_token.get("access_token") != access_token:
+    if not CSRFHandler.verify(credentials.credentials, "access_token", access_token):
         raise ForbiddenException("Invalid CSRF Token")
     return user_id
 
@@ -39,13 +43,25 @@ async def get_current_user_with_refresh(
     user_id = token.get("verify")
     if not user_id:
         raise ForbiddenException("Invalid Refresh Token")
-    csrf_token = JWTHandler.decode(credentials.credentials)
-    if csrf_token.get("refresh_token") != refresh_token:
+    if not CSRFHandler.verify(credentials.credentials, "refresh_token", refresh_token):
         raise ForbiddenException("Invalid CSRF Token")
     return user_id
 
 
 async def get_current_user_from_db(
-    db_session: DBManager = Depends(get_db), user_id: str = Depends(get_current_user)
+    db_session: DBManager = Depends(get_db),
+    redis_session: RedisManager = Depends(get_redis_db),
+    user_id: str = Depends(get_current_user),
 ):
-    return await AuthController(db_session).me(user_id)
+    return await AuthController(db_session, redis_session).me(user_id)
+
+
+async def require_admin_key(x_admin_key: str | None = Header(default=None)):
+    if not settings.ADMIN_API_KEY or not x_admin_key:
+        raise ForbiddenException("Admin API is not available")
+    if not hmac.compare_digest(x_admin_key.encode(), settings.ADMIN_API_KEY.encode()):
+        raise ForbiddenException("Invalid admin key")
+
+
+def get_session_id(request: Request) -> str:
+    return request.state.session_id
@@ -9,6 +9,8 @@ class User(SQLBase, UUIDMixin, TimestampMixin):
     __tablename__ = "users"
 
     username: Mapped[str] = mapped_column(unique=True, default=None)
+    # lower(username), so case-insensitive lookups can use a plain unique index.
+    username_normalized: Mapped[str] = mapped_column(unique=True, index=True, default=None)
     password: Mapped[str] = mapped_column(default=None)
     gauth: Mapped[str] = mapped_column(default=None)
 
@@ -0,0 +1,49 @@
+import base64
+import hashlib
+import hmac
+
+from ..core.config import settings
+from .jwt import JWTHandler
+
+HMAC_DIGEST_SIZE = 16
+
+
+class CSRFHandler:
+    """Binds CSRF tokens to the auth tokens they protect.
+
+    In `jwt` mode the CSRF token is a signed JWT that embeds the bound tokens. In `hmac`
+    mode it is one truncated HMAC per bound token, joined by dots, checked in constant
+    time without any JWT parsing.
+    """
+
+    mode = settings.CSRF_TOKEN_MODE
+    secret = hashlib.sha256(b"csrf:" + settings.SECRET_KEY.encode()).digest()
+    jwt_handler = JWTHandler
+
+    @staticmethod
+    def _mac(claim: str, token: str) -> str:
+        digest = hmac.new(
+            CSRFHandler.secret, f"{claim}:{token}".encode(), hashlib.sha256
+        ).digest()[:HMAC_DIGEST_SIZE]
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    @staticmethod
+    def encode(refresh_token: str, access_token: str | None = None) -> str:
+        tokens = {"refresh_token": refresh_token}
+        if access_token is not None:
+            tokens["access_token"] = access_token
+        if CSRFHandler.mode == "hmac":
+            return ".".join(CSRFHandler._mac(claim, token) for claim, token in tokens.items())
+        return CSRFHandler.jwt_handler.encode_refresh_token(
+            payload={"sub": "csrf_token", **tokens}
+        )
+
+    @staticmethod
+    def verify(csrf_token: str, claim: str, token: str) -> bool:
+        if CSRFHandler.mode == "hmac":
+            expected = CSRFHandler._mac(claim, token)
+            return any(
+                hmac.compare_digest(segment, expected) for segment in csrf_token.split(".", 1)
+            )
+        bound_token = CSRFHandler.jwt_handler.decode(csrf_token).get(claim)
+        return bound_token is not None and hmac.compare_digest(str(bound_token), token)
@@ -1,10 +1,15 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Any, Dict
 
 from jose import ExpiredSignatureError, JWTError, jwt
 
+from ..core.cache import TTLCache
 from ..core.config import settings
 from ..core.exceptions import CustomException
+from ..core.instrumentation import instrumentation, instrumented
+from .jwt_keys import KeyRing
 
 
 class JWTDecodeError(CustomException):
@@ -22,42 +27,109 @@ class JWTHandler:
     algorithm = settings.JWT_ALGORITHM
     access_token_expire = settings.JWT_EXPIRE_MINUTES
     refresh_token_expire = 60 * 60 * 24 * 7
+    # When asymmetric keys are configured they replace the shared secret entirely.
+    key_ring = KeyRing.from_files(
+        settings.JWT_PRIVATE_KEYS, settings.JWT_PUBLIC_KEYS, settings.JWT_ACTIVE_KID
+    )
+    # (kid, claims) of tokens that already passed signature verification, keyed by token
+    # digest and evicted when the token expires. A hit whose kid has since left the key
+    # ring is dropped, so retiring a key revokes its tokens right away.
+    token_cache = TTLCache(maxsize=settings.JWT_CACHE_SIZE)
 
     @staticmethod
+    def _cache_key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    @staticmethod
+    def _cache_claims(key: bytes, kid: str | None, claims: dict) -> None:
+        exp = claims.get("exp")
+        ttl = None if exp is None else exp - time.time()
+        if ttl is None or ttl > 0:
+            JWTHandler.token_cache.set(key, (kid, claims), ttl=ttl)
+
+    @staticmethod
+    def _cached_claims(key: bytes) -> dict | None:
+        cached = JWTHandler.token_cache.get(key)
+        if cached is None:
+            return None
+        kid, claims = cached
+        trusted = JWTHandler.key_ring.get(kid) is not None if JWTHandler.key_ring else kid is None
+        if not trusted:
+            JWTHandler.token_cache.delete(key)
+            return None
+        return claims
+
+    @staticmethod
+    def _sign(payload: Dict[str, Any]) -> str:
+        if JWTHandler.key_ring:
+            key = JWTHandler.key_ring.active
+            return jwt.encode(
+                payload, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid}
+            )
+        return jwt.encode(payload, JWTHandler.secret_key, algorithm=JWTHandler.algorithm)
+
+    @staticmethod
+    def _verify(token: str, **kwargs) -> tuple[str | None, dict]:
+        """Verify the signature and return the kid that verified it with the claims."""
+        if JWTHandler.key_ring:
+            key = JWTHandler.key_ring.get(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                raise JWTDecodeError
+            claims = jwt.decode(token, key.public_key, algorithms=[key.algorithm], **kwargs)
+            return key.kid, claims
+        return None, jwt.decode(
+            token, JWTHandler.secret_key, algorithms=[JWTHandler.algorithm], **kwargs
+        )
+
+    @staticmethod
+    def jwks() -> dict:
+        return JWTHandler.key_ring.jwks()
+
+    @staticmethod
+    @instrumented("jwt.encode")
     def encode(payload: Dict[str, Any]) -> str:
         expire = datetime.utcnow() + timedelta(minutes=JWTHandler.access_token_expire)
         payload.update({"exp": expire})
-        return jwt.encode(payload, JWTHandler.secret_key, algorithm=JWTHandler.algorithm)
+        return JWTHandler._sign(payload)
 
     @staticmethod
+    @instrumented("jwt.encode_refresh_token")
     def encode_refresh_token(payload: Dict[str, Any]) -> str:
         expire = datetime.utcnow() + timedelta(minutes=JWTHandler.refresh_token_expire)
         payload.update({"exp": expire})
-        return jwt.encode(payload, JWTHandler.secret_key, algorithm=JWTHandler.algorithm)
+        return JWTHandler._sign(payload)
 
     @staticmethod
+    @instrumented("jwt.decode")
     def decode(token: str) -> dict:
+        key = JWTHandler._cache_key(token)
+        cached = JWTHandler._cached_claims(key)
+        instrumentation.annotate(**{"jwt.cache_hit": cached is not None})
+        if cached is not None:
+            return dict(cached)
         try:
-            result: dict = jwt.decode(
-                token, JWTHandler.secret_key, algorithms=[JWTHandler.algorithm]
-            )
+            kid, result = JWTHandler._verify(token)
             exp = result.get("exp")
             if exp and datetime.utcfromtimestamp(exp) < datetime.utcnow():
                 raise JWTExpiredError
-            return result
+            JWTHandler._cache_claims(key, kid, result)
+            return dict(result)
         except ExpiredSignatureError as exception:
             raise JWTExpiredError() from exception
         except JWTError as exception:
             raise JWTDecodeError() from exception
 
     @staticmethod
+    @instrumented("jwt.decode_expired")
     def decode_expired(token: str) -> dict:
+        key = JWTHandler._cache_key(token)
+        cached = JWTHandler._cached_claims(key)
+        instrumentation.annotate(**{"jwt.cache_hit": cached is not None})
+        if cached is not None:
+            return dict(cached)
         try:
-            return jwt.decode(
-                token,
-                JWTHandler.secret_key,
-                algorithms=[JWTHandler.algorithm],
-                options={"verify_exp": False},
-            )
+            kid, result = JWTHandler._verify(token, options={"verify_exp": False})
+            JWTHandler._cache_claims(key, kid, result)
+            return dict(result)
         except JWTError as exception:
             raise JWTDecodeError() from exception
@@ -0,0 +1,102 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwk
+from jose.backends.base import Key
+
+EC_ALGORITHMS = {"secp256r1": "ES256", "secp384r1": "ES384", "secp521r1": "ES512"}
+
+
+def key_algorithm(key: Any) -> str:
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)):
+        if key.curve.name not in EC_ALGORITHMS:
+            raise ValueError(f"Unsupported curve: {key.curve.name}")
+        return EC_ALGORITHMS[key.curve.name]
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256"
+    raise ValueError(f"Unsupported key type: {type(key).__name__}")
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    public_key: Key
+    private_key: Key | None = None
+
+    @classmethod
+    def from_pem(cls, kid: str, pem: bytes) -> "SigningKey":
+        if b"PRIVATE KEY" in pem:
+            algorithm = key_algorithm(serialization.load_pem_private_key(pem, password=None))
+            private_key = jwk.construct(pem, algorithm)
+            return cls(kid, algorithm, private_key.public_key(), private_key)
+        algorithm = key_algorithm(serialization.load_pem_public_key(pem))
+        return cls(kid, algorithm, jwk.construct(pem, algorithm))
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "SigningKey":
+        path = Path(path)
+        return cls.from_pem(path.stem, path.read_bytes())
+
+    def to_jwk(self) -> dict:
+        return {**self.public_key.to_dict(), "kid": self.kid, "use": "sig"}
+
+
+@dataclass
+class KeyRing:
+    """Asymmetric JWT keys indexed by `kid`.
+
+    Tokens are signed with the active key. Every key in the ring, including
+    public-only keys kept around after a rotation, is accepted for verification and
+    published in the JWKS document.
+    """
+
+    keys: dict[str, SigningKey] = field(default_factory=dict)
+    active_kid: str | None = None
+
+    @classmethod
+    def from_files(
+        cls,
+        private_keys: Iterable[str] = (),
+        public_keys: Iterable[str] = (),
+        active_kid: str | None = None,
+    ) -> "KeyRing":
+        ring = cls()
+        for path in [*private_keys, *public_keys]:
+            ring.add(SigningKey.from_file(path))
+        if active_kid is not None:
+            ring.activate(active_kid)
+        return ring
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    def add(self, key: SigningKey) -> None:
+        self.keys[key.kid] = key
+        if self.active_kid is None and key.private_key is not None:
+            self.active_kid = key.kid
+
+    def remove(self, kid: str) -> None:
+        if kid == self.active_kid:
+            raise ValueError(f"Cannot retire the active signing key {kid}")
+        self.keys.pop(kid, None)
+
+    def activate(self, kid: str) -> None:
+        if kid not in self.keys or self.keys[kid].private_key is None:
+            raise ValueError(f"No private key loaded for kid {kid}")
+        self.active_kid = kid
+
+    @property
+    def active(self) -> SigningKey:
+        if self.active_kid is None:
+            raise ValueError("No active signing key")
+        return self.keys[self.active_kid]
+
+    def get(self, kid: str | None) -> SigningKey | None:
+        return self.keys.get(kid) if kid else None
+
+    def jwks(self) -> dict:
+        return {"keys": [key.to_jwk() for key in self.keys.values()]}
@@ -1,11 +1,108 @@
+import statistics
+import time
+from functools import lru_cache
+from secrets import token_hex
+
 from passlib.context import CryptContext
 
+from ..core.config import settings
+from ..core.executor import WorkerPool
+from ..core.instrumentation import instrumented
 
-class PasswordHandler:
-    pwd_context = CryptContext(
+BCRYPT_MIN_ROUNDS = 4
+BCRYPT_MAX_ROUNDS = 31
+
+
+@lru_cache(maxsize=8)
+def _load_context(config: str) -> CryptContext:
+    return CryptContext.from_string(config)
+
+
+def _hash(config: str, password: str) -> str:
+    return _load_context(config).hash(password)
+
+
+def _hash_many(config: str, passwords: list[str]) -> list[str]:
+    context = _load_context(config)
+    return [context.hash(password) for password in passwords]
+
+
+def _verify(config: str, plain_password: str, hashed_password: str) -> bool:
+    return _load_context(config).verify(plain_password, hashed_password)
+
+
+def build_context(rounds: int | None = None) -> CryptContext:
+    if rounds is None:
+        return CryptContext(schemes=["bcrypt"], deprecated="auto")
+    # Only hashes below the configured cost are flagged by `needs_update`, so logins
+    # upgrade weak hashes but never downgrade or churn stronger ones.
+    return CryptContext(
         schemes=["bcrypt"],
         deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+    )
+
+
+def measure_verify(rounds: int, samples: int = 3) -> float:
+    """Median seconds a single verify takes at the given bcrypt cost on this host."""
+    context = build_context(rounds)
+    hashed = context.hash("calibration")
+    timings = []
+    for _ in range(samples):
+        start_time = time.perf_counter()
+        context.verify("calibration", hashed)
+        timings.append(time.perf_counter() - start_time)
+    return statistics.median(timings)
+
+
+def calibrate_rounds(
+    target_ms: float,
+    min_rounds: int = BCRYPT_MIN_ROUNDS,
+    max_rounds: int = BCRYPT_MAX_ROUNDS,
+    samples: int = 3,
+) -> tuple[int, dict[int, float]]:
+    """Pick the highest bcrypt cost whose verify still fits in `target_ms`.
+
+    Each extra round doubles the work, so measuring stops at the first cost over the
+    target. Returns the chosen cost and the measured milliseconds per cost.
+    """
+    chosen = min_rounds
+    timings: dict[int, float] = {}
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings[rounds] = measure_verify(rounds, samples=samples) * 1000
+        if timings[rounds] > target_ms:
+            break
+        chosen = rounds
+    return chosen, timings
+
+
+class PasswordHandler:
+    pwd_context = build_context(settings.BCRYPT_ROUNDS)
+    pwd_config = pwd_context.to_string()
+    pool = WorkerPool(
+        kind=settings.PASSWORD_POOL_KIND,  # type: ignore
+        max_workers=settings.PASSWORD_POOL_WORKERS,
+        max_pending=settings.PASSWORD_POOL_MAX_PENDING,
     )
+    dummy_hash: str | None = None
+
+    @staticmethod
+    def configure(rounds: int | None) -> None:
+        PasswordHandler.pwd_context = build_context(rounds)
+        PasswordHandler.pwd_config = PasswordHandler.pwd_context.to_string()
+        PasswordHandler.dummy_hash = None
+
+    @staticmethod
+    async def calibrate(target_ms: float = settings.BCRYPT_TARGET_MS) -> int:
+        """Measure this host in the worker pool and switch to the cost that fits `target_ms`.
+
+        Safe on a fleet with mixed node sizes: hashes made elsewhere with a higher cost
+        are still accepted as they are, only lower ones are upgraded on login.
+        """
+        rounds, _ = await PasswordHandler.pool.run(calibrate_rounds, target_ms)
+        PasswordHandler.configure(rounds)
+        return rounds
 
     @staticmethod
     def hash(password: str):
@@ -14,3 +111,32 @@ class PasswordHandler:
     @staticmethod
     def verify(hashed_password: str, plain_password: str):
         return PasswordHandler.pwd_context.verify(plain_password, hashed_password)
+
+    @staticmethod
+    def is_hash(value: str) -> bool:
+        return PasswordHandler.pwd_context.identify(value, required=False) is not None
+
+    @staticmethod
+    def needs_update(hashed_password: str) -> bool:
+        return PasswordHandler.pwd_context.needs_update(hashed_password)
+
+    @staticmethod
+    @instrumented("password.hash")
+    async def hash_async(password: str) -> str:
+        return await PasswordHandler.pool.run(_hash, PasswordHandler.pwd_config, password)
+
+    @staticmethod
+    @instrumented("password.verify")
+    async def verify_async(hashed_password: str, plain_password: str) -> bool:
+        return await PasswordHandler.pool.run(
+            _verify, PasswordHandler.pwd_config, plain_password, hashed_password
+        )
+
+    @staticmethod
+    @instrumented("password.dummy_verify")
+    async def dummy_verify_async(plain_password: str) -> bool:
+        """Spend the same bcrypt time as a real verify, for users that do not exist."""
+        if PasswordHandler.dummy_hash is None:
+            PasswordHandler.dummy_hash = await PasswordHandler.hash_async(token_hex(16))
+        await PasswordHandler.verify_async(PasswordHandler.dummy_hash, plain_password)
+        return False
@@ -0,0 +1,48 @@
+import io
+from enum import Enum
+
+import qrcode
+import qrcode.image.svg
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.executor import WorkerPool
+from ..core.instrumentation import instrumentation
+
+
+class QRFormat(str, Enum):
+    PNG = "png"
+    SVG = "svg"
+
+    @property
+    def media_type(self) -> str:
+        return "image/svg+xml" if self is QRFormat.SVG else "image/png"
+
+
+def _render(data: str, fmt: str) -> bytes:
+    buffered = io.BytesIO()
+    if fmt == QRFormat.SVG.value:
+        qrcode.make(data, image_factory=qrcode.image.svg.SvgPathImage).save(buffered)
+    else:
+        qrcode.make(data).save(buffered)
+    return buffered.getvalue()
+
+
+class QRCodeHandler:
+    cache = TTLCache(maxsize=settings.QR_CACHE_SIZE, ttl=settings.QR_CACHE_TTL_SECONDS)
+    pool = WorkerPool(
+        kind=settings.QR_POOL_KIND,  # type: ignore
+        max_workers=settings.QR_POOL_WORKERS,
+        max_pending=settings.QR_POOL_MAX_PENDING,
+    )
+
+    @staticmethod
+    async def render(data: str, fmt: QRFormat = QRFormat.SVG) -> bytes:
+        # The provisioning uri embeds the user's secret, so it identifies the user.
+        key = (data, fmt.value)
+        image = QRCodeHandler.cache.get(key)
+        instrumentation.annotate(**{"qr.cache_hit": image is not None})
+        if image is None:
+            image = await QRCodeHandler.pool.run(_render, data, fmt.value)
+            QRCodeHandler.cache.set(key, image)
+        return image
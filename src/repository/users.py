@@ -3,8 +3,12 @@ from typing import Any
 from sqlalchemy.engine import Row
 
 from ..adaptors.users import UserAdaptor
+from ..core.config import settings
 from ..core.database import DBManager
+from ..core.instrumentation import instrumentation, instrumented
+from ..core.redis.client import RedisKey, RedisManager
 from ..models.user import User
+from ..schema.out.user import UserOut
 
 
 class UserRepository:
@@ -16,25 +20,81 @@ class UserRepository:
             return None
         return user._mapping.get("User", user._mapping)
 
-    async def get_and_create(
+    @instrumented("users.create")
+    async def create(
         self, username: str, password: str, gauth: str, db_session: DBManager
     ) -> User | None:
-        create_query = self.adaptor.create(password=password, username=username, gauth=gauth)
+        """Inserts the user in one round trip; returns None if the username is taken."""
+        query = self.adaptor.insert(
+            username=username,
+            password=password,
+            gauth=gauth,
+            dialect=db_session.engine.dialect.name,
+        )
         async with db_session.begin() as session:
-            session.add(create_query)
-            await session.flush()
-            query = self.adaptor.query_by_username(username)
             user = (await session.execute(query)).first()
         return UserRepository.base_return(user)
 
+    @instrumented("users.bulk_create")
+    async def bulk_create(self, users: list[dict], db_session: DBManager) -> int:
+        """Inserts a batch of users with one executemany; returns how many were new."""
+        if not users:
+            return 0
+        query = self.adaptor.bulk_insert(dialect=db_session.engine.dialect.name)
+        async with db_session.begin() as session:
+            inserted = (await session.execute(query, users)).all()
+        return len(inserted)
+
+    @instrumented("users.get_by_username")
     async def get_by_username(self, username: str, db_session: DBManager) -> User | None:
         query = self.adaptor.get_by_username(username)
-        async with db_session.begin() as session:
-            user = (await session.execute(query)).first()
+        async with db_session.read() as conn:
+            user = (await conn.execute(query)).first()
         return UserRepository.base_return(user)
 
+    @instrumented("users.query_by_id")
     async def query_by_id(self, user_id: str, db_session: DBManager) -> User | None:
         query = self.adaptor.query_by_id(user_id)
-        async with db_session.begin() as session:
-            user = (await session.execute(query)).first()
+        async with db_session.read() as conn:
+            user = (await conn.execute(query)).first()
         return UserRepository.base_return(user)
+
+    @instrumented("users.get_profile")
+    async def get_profile(
+        self, user_id: str, db_session: DBManager, redis_session: RedisManager | None = None
+    ) -> UserOut | None:
+        use_cache = redis_session is not None and settings.PROFILE_CACHE_TTL_SECONDS > 0
+        if use_cache:
+            cached = await redis_session.get(RedisKey.profile(user_id))  # type: ignore
+            instrumentation.annotate(**{"profile.cache_hit": bool(cached)})
+            if cached:
+                return UserOut.parse_raw(cached)
+
+        user = await self.query_by_id(user_id, db_session=db_session)
+        if not user:
+            return None
+        profile = UserOut(
+            username=user.username, updated_at=user.updated_at, created_at=user.created_at
+        )
+        if use_cache:
+            await redis_session.set(  # type: ignore
+                RedisKey.profile(user_id), profile.json(), ex=settings.PROFILE_CACHE_TTL_SECONDS
+            )
+        return profile
+
+    async def invalidate_profile(self, user_id: str, redis_session: RedisManager | None) -> None:
+        if redis_session is not None:
+            await redis_session.delete(RedisKey.profile(user_id))
+
+    @instrumented("users.update_password")
+    async def update_password(
+        self,
+        user_id: str,
+        password: str,
+        db_session: DBManager,
+        redis_session: RedisManager | None = None,
+    ) -> None:
+        query = self.adaptor.update_password(user_id, password)
+        async with db_session.begin() as session:
+            await session.execute(query)
+        await self.invalidate_profile(user_id, redis_session)
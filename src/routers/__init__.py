@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
+from .admin import router as admin_router
 from .auth import router as auth_router
 
 routers = APIRouter()
 routers.include_router(auth_router)
+routers.include_router(admin_router)
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Request
+
+from ..controllers.user_import import ImportFormat, UserImporter, import_jobs, spool
+from ..core.config import settings
+from ..core.database import DBManager, get_db
+from ..core.exceptions import NotFoundException
+from ..depends import require_admin_key
+
+router = APIRouter(
+    prefix="/admin",
+    tags=[
+        "admin",
+    ],
+    dependencies=[Depends(require_admin_key)],
+)
+
+
+@router.post("/users/import", status_code=202)
+async def import_users(
+    request: Request,
+    fmt: ImportFormat = ImportFormat.NDJSON,
+    batch_size: int = settings.IMPORT_BATCH_SIZE,
+    db_session: DBManager = Depends(get_db),
+) -> dict:
+    """Accept the upload and import it in the background; poll the returned job id."""
+    source = await spool(request.stream())
+    importer = UserImporter(db_session=db_session, batch_size=batch_size)
+    return import_jobs.start(importer, source, fmt).as_dict()
+
+
+@router.get("/users/import/{job_id}")
+async def import_status(job_id: str) -> dict:
+    job = import_jobs.get(job_id)
+    if job is None:
+        raise NotFoundException("Import job not found")
+    return job.as_dict()
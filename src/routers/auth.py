@@ -1,12 +1,18 @@
-import asyncio
-import time
-
 from fastapi import APIRouter, Depends, Request, Response
 
 from ..controllers.auth import AuthController
+from ..core.config import settings
 from ..core.database import DBManager, get_db
 from ..core.redis.client import RedisManager, get_redis_db
-from ..depends import get_current_user, get_current_user_from_db, get_current_user_with_refresh
+from ..core.timing import TimingEqualizer
+from ..depends import (
+    get_current_user,
+    get_current_user_from_db,
+    get_current_user_with_refresh,
+    get_session_id,
+)
+from ..repository.jwt import JWTHandler
+from ..repository.qr_code import QRFormat
 from ..schema._in.user import UserIn
 from ..schema.out.user import UserOut, UserOutRegister
 
@@ -16,29 +22,22 @@ router = APIRouter(
         "auth",
     ],
 )
+timing_equalizer = TimingEqualizer(
+    floor=settings.AUTH_TIMING_FLOOR_MS / 1000, jitter=settings.AUTH_TIMING_JITTER_MS / 1000
+)
+equalized_router = APIRouter(route_class=timing_equalizer.route_class)
 
 
-@router.post("/login")
+@equalized_router.post("/login")
 async def login(
     data: UserIn,
     response: Response,
     db_session: DBManager = Depends(get_db),
     redis_db: RedisManager = Depends(get_redis_db),
 ):
-    start_time = time.time()
-    try:
-        tokens = await AuthController(db_session=db_session, redis_session=redis_db).login(
-            **data.dict()
-        )
-        elapsed_time = time.time() - start_time
-        if elapsed_time < 1:
-            await asyncio.sleep(1 - elapsed_time)
-    except Exception as e:
-        end_time = time.time()
-        elapsed_time = end_time - start_time
-        if elapsed_time < 1:
-            await asyncio.sleep(1 - elapsed_time)
-        raise e from None
+    tokens = await AuthController(db_session=db_session, redis_session=redis_db).login(
+        **data.dict()
+    )
 
     response.set_cookie(
         key="Refresh-Token",
@@ -58,39 +57,31 @@ async def verify(
     db_session: DBManager = Depends(get_db),
     redis_db: RedisManager = Depends(get_redis_db),
     user_id: str = Depends(get_current_user_with_refresh),
+    session_id: str = Depends(get_session_id),
 ):
     assert user_id is not None
     await AuthController(db_session=db_session, redis_session=redis_db).verify(
         refresh_token=request.cookies.get("Refresh-Token", ""),
-        session_id=request.cookies.get("Session-Id", ""),
+        session_id=session_id,
         code=code,
     )
 
 
-@router.post("/refresh")
+@equalized_router.post("/refresh")
 async def refresh_token(
     response: Response,
     request: Request,
     db_session: DBManager = Depends(get_db),
     redis_db: RedisManager = Depends(get_redis_db),
     user_id: str = Depends(get_current_user_with_refresh),
+    session_id: str = Depends(get_session_id),
 ):
     assert user_id is not None
-    start_time = time.time()
-    try:
-        tokens = await AuthController(db_session=db_session, redis_session=redis_db).refresh_token(
-            old_refresh_token=request.cookies.get("Refresh-Token", ""),
-            session_id=request.cookies.get("Session-Id", ""),
-        )
-        elapsed_time = time.time() - start_time
-        if elapsed_time < 1:
-            await asyncio.sleep(1 - elapsed_time)
-    except Exception as e:
-        end_time = time.time()
-        elapsed_time = end_time - start_time
-        if elapsed_time < 1:
-            await asyncio.sleep(1 - elapsed_time)
-        raise e from None
+    tokens = await AuthController(db_session=db_session, redis_session=redis_db).refresh_token(
+        old_refresh_token=request.cookies.get("Refresh-Token", ""),
+        session_id=session_id,
+        user_id=user_id,
+    )
 
     assert tokens.access_token is not None
     response.set_cookie(
@@ -112,8 +103,27 @@ async def refresh_token(
 
 
 @router.post("/register")
-async def register(data: UserIn, db_session: DBManager = Depends(get_db)) -> UserOutRegister:
-    return await AuthController(db_session=db_session).register(**data.dict())
+async def register(
+    data: UserIn, qr_format: QRFormat | None = None, db_session: DBManager = Depends(get_db)
+) -> UserOutRegister:
+    return await AuthController(db_session=db_session).register(**data.dict(), qr_format=qr_format)
+
+
+@router.get("/qr")
+async def qr_code(
+    qr_format: QRFormat = QRFormat.SVG,
+    db_session: DBManager = Depends(get_db),
+    user_id: str = Depends(get_current_user),
+):
+    """Only for sessions that passed /verify: the image carries the TOTP seed."""
+    image = await AuthController(db_session=db_session).qr_code(user_id, qr_format)
+    return Response(content=image, media_type=qr_format.media_type)
+
+
+@router.get("/.well-known/jwks.json")
+async def jwks(response: Response) -> dict:
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return JWTHandler.jwks()
 
 
 @router.get("/me")
@@ -128,7 +138,7 @@ async def logout(
     current_user: str = Depends(get_current_user),
     redis_db: RedisManager = Depends(get_redis_db),
 ):
-    await AuthController(redis_db=redis_db, db_session=None).logout(  # type: ignore
+    await AuthController(redis_session=redis_db, db_session=None).logout(  # type: ignore
         request.cookies.get("Refresh-Token", ""),  # type: ignore
     )
     response.set_cookie(
@@ -146,3 +156,6 @@ async def logout(
         samesite="strict",
     )
     return None
+
+
+router.include_router(equalized_router)
@@ -12,4 +12,5 @@ class UserOut(BaseModel):
 
 
 class UserOutRegister(UserQuery):
-    qr_img: str
+    provisioning_uri: str
+    qr_img: str | None = None
@@ -1,9 +1,46 @@
+class PipelineMock:
+    def __init__(self, redis: "RedisMock"):
+        self.redis = redis
+        self.commands = []
+
+    def get(self, name):
+        self.commands.append((self.redis.get, (name,)))
+        return self
+
+    def ttl(self, name):
+        self.commands.append((self.redis.ttl, (name,)))
+        return self
+
+    def set(self, name, value, ex):
+        self.commands.append((self.redis.set, (name, value, ex)))
+        return self
+
+    def delete(self, *names):
+        self.commands.append((self.redis.delete, names))
+        return self
+
+    async def execute(self):
+        results = [await command(*args) for command, args in self.commands]
+        self.commands = []
+        return results
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            await self.execute()
+
+
 class RedisMock:
     database = {}
 
     async def get(self, name):
         return RedisMock.database.get(str(name), None)
 
+    async def mget(self, *names):
+        return [RedisMock.database.get(str(name), None) for name in names]
+
     async def set(self, name, value, ex):
         RedisMock.database[str(name)] = value
         return True
@@ -11,5 +48,21 @@ class RedisMock:
     async def ttl(self, name):
         return 100
 
-    async def delete(self, name):
-        RedisMock.database.pop(str(name), None)
+    async def delete(self, *names):
+        for name in names:
+            RedisMock.database.pop(str(name), None)
+
+    async def rotate_refresh_token(self, old_refresh_token, refresh_token, session_id, user_id):
+        stored_user_id = RedisMock.database.get(str(old_refresh_token))
+        if stored_user_id is None or str(stored_user_id) != str(user_id):
+            return 0
+        if str(RedisMock.database.get(str(session_id))) != str(stored_user_id):
+            return -1
+        RedisMock.database[str(refresh_token)] = RedisMock.database.pop(str(old_refresh_token))
+        return 1
+
+    def pipeline(self):
+        return PipelineMock(self)
+
+    def transaction(self):
+        return PipelineMock(self)
@@ -0,0 +1,28 @@
+import pytest
+
+from benchmarks import access_control, jwt
+from benchmarks.__main__ import compare
+from benchmarks.common import measure
+from src.repository.jwt import JWTHandler
+
+
+class TestBenchmarks:
+    def test_measure_reports_percentiles(self):
+        result = measure(lambda: None, iterations=50, warmup=0)
+        assert result["iterations"] == 50
+        assert result["ops_per_s"] > 0
+        assert result["p50_us"] <= result["p95_us"] <= result["p99_us"]
+
+    def test_suites_run(self):
+        results = jwt.run(iterations=5)
+        assert set(results) == {"encode", "decode.cold", "decode.cached"}
+        assert len(JWTHandler.token_cache) == 0
+
+        results = access_control.run(acl_sizes=(10,), resource_counts=(2,), iterations=5)
+        assert results["has_permission.acl_10.resources_2"]["iterations"] == 5
+
+    @pytest.mark.parametrize("after, regressed", [(110.0, []), (150.0, ["jwt.encode.p50_us"])])
+    def test_compare_flags_slower_median(self, after, regressed, capsys):
+        old = {"results": {"jwt": {"encode": {"p50_us": 100.0, "p99_us": 100.0}}}}
+        new = {"results": {"jwt": {"encode": {"p50_us": after, "p99_us": 900.0}}}}
+        assert compare(old, new, threshold=0.2) == regressed
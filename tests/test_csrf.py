@@ -0,0 +1,34 @@
+import pytest
+
+from src.repository.csrf import CSRFHandler
+from src.repository.jwt import JWTHandler
+
+
+@pytest.fixture(params=["jwt", "hmac"])
+def csrf_mode(request, monkeypatch):
+    monkeypatch.setattr(CSRFHandler, "mode", request.param)
+    return request.param
+
+
+class TestCSRFHandler:
+    def test_binds_refresh_and_access_tokens(self, csrf_mode):
+        refresh_token = JWTHandler.encode_refresh_token(payload={"verify": "user"})
+        access_token = JWTHandler.encode(payload={"user_id": "user"})
+
+        csrf_token = CSRFHandler.encode(refresh_token=refresh_token)
+        assert CSRFHandler.verify(csrf_token, "refresh_token", refresh_token)
+        assert not CSRFHandler.verify(csrf_token, "access_token", access_token)
+
+        csrf_token = CSRFHandler.encode(refresh_token=refresh_token, access_token=access_token)
+        assert CSRFHandler.verify(csrf_token, "refresh_token", refresh_token)
+        assert CSRFHandler.verify(csrf_token, "access_token", access_token)
+        assert not CSRFHandler.verify(csrf_token, "access_token", refresh_token)
+
+    def test_hmac_tokens_are_compact(self, csrf_mode):
+        refresh_token = JWTHandler.encode_refresh_token(payload={"verify": "user"})
+        access_token = JWTHandler.encode(payload={"user_id": "user"})
+        csrf_token = CSRFHandler.encode(refresh_token=refresh_token, access_token=access_token)
+        if csrf_mode == "hmac":
+            assert len(csrf_token) == 45
+        else:
+            assert len(csrf_token) > len(refresh_token) + len(access_token)
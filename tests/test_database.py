@@ -0,0 +1,178 @@
+from uuid import uuid4
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from src.core.database.pool import InstrumentedQueuePool
+from src.core.database.session import DBManager, Replica, SQLBase, engine_kwargs
+from src.core.instrumentation import instrumentation
+from src.models import User
+
+
+@pytest.mark.asyncio
+class TestDBManager:
+    async def test_read_uses_plain_connection(self, mock_database):
+        async with mock_database.read() as conn:
+            assert isinstance(conn, AsyncConnection)
+            assert (await conn.execute(sa.select(sa.func.count()).select_from(User))).scalar() == 0
+
+    async def test_read_never_commits(self, mock_database):
+        async with mock_database.read() as conn:
+            await conn.execute(
+                sa.insert(User).values(
+                    id="6c0f52b2-8d0a-4a38-9a8d-2a3f0b1d9e11",
+                    username="uncommitted",
+                    username_normalized="uncommitted",
+                    password="x",
+                    gauth="x",
+                    created_at=sa.func.now(),
+                    updated_at=sa.func.now(),
+                )
+            )
+        async with mock_database.read() as conn:
+            assert (await conn.execute(sa.select(sa.func.count()).select_from(User))).scalar() == 0
+
+
+async def make_database(path, replica_paths=(), **kwargs) -> DBManager:
+    database = DBManager(
+        model_base=SQLBase,
+        db_url=f"sqlite+aiosqlite:///{path}",
+        replica_urls=[f"sqlite+aiosqlite:///{replica}" for replica in replica_paths],
+        **kwargs,
+    )
+    for engine in [database.engine] + [replica.engine for replica in database.replicas]:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLBase.metadata.create_all)
+    return database
+
+
+async def count_users(conn) -> int:
+    return (await conn.execute(sa.select(sa.func.count()).select_from(User))).scalar()
+
+
+async def insert_user(engine, username: str) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(
+            sa.insert(User).values(
+                id=str(uuid4()),
+                username=username,
+                username_normalized=username,
+                password="x",
+                gauth="x",
+                created_at=sa.func.now(),
+                updated_at=sa.func.now(),
+            )
+        )
+
+
+@pytest.mark.asyncio
+class TestReadReplicas:
+    async def test_reads_go_to_replica(self, tmp_path):
+        database = await make_database(tmp_path / "primary.db", [tmp_path / "replica.db"])
+        await insert_user(database.replicas[0].engine, "replicated")
+
+        async with database.read() as conn:
+            assert await count_users(conn) == 1
+        async with database.read(primary=True) as conn:
+            assert await count_users(conn) == 0
+        await database.dispose()
+
+    async def test_round_robin(self, tmp_path):
+        database = await make_database(
+            tmp_path / "primary.db", [tmp_path / "first.db", tmp_path / "second.db"]
+        )
+        await insert_user(database.replicas[1].engine, "second")
+
+        counts = []
+        for _ in range(4):
+            async with database.read() as conn:
+                counts.append(await count_users(conn))
+        assert counts == [0, 1, 0, 1]
+        await database.dispose()
+
+    async def test_least_busy(self, tmp_path):
+        database = await make_database(
+            tmp_path / "primary.db",
+            [tmp_path / "first.db", tmp_path / "second.db"],
+            replica_strategy="least_busy",
+        )
+        first, second = database.replicas
+        first.in_flight = 3
+        assert database.pick_replica() is second
+        async with database.read():
+            assert second.in_flight == 1
+        assert second.in_flight == 0
+        await database.dispose()
+
+    async def test_falls_back_to_primary_when_replica_is_down(self, tmp_path):
+        database = await make_database(tmp_path / "primary.db")
+        database.replicas = [
+            Replica(create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db"))
+        ]
+        await insert_user(database.engine, "primary")
+
+        async with database.read() as conn:
+            assert await count_users(conn) == 1
+        assert not database.replicas[0].available
+        assert database.replicas[0].in_flight == 0
+        assert database.pick_replica() is None
+        await database.dispose()
+
+
+class TestEngineOptions:
+    def test_sqlite_keeps_connection_options(self):
+        options = engine_kwargs(
+            "sqlite+aiosqlite:///:memory:",
+            500,
+            pool_size=10,
+            max_overflow=20,
+            pool_pre_ping=True,
+            pool_recycle=300,
+        )
+        assert options == {"pool_pre_ping": True, "pool_recycle": 300}
+
+    def test_sqlite_keeps_sizing_for_queue_pool(self):
+        options = engine_kwargs(
+            "sqlite+aiosqlite:///db.sqlite", poolclass=InstrumentedQueuePool, pool_size=2
+        )
+        assert options == {"poolclass": InstrumentedQueuePool, "pool_size": 2}
+
+    def test_asyncpg_uses_instrumented_pool(self):
+        options = engine_kwargs("postgresql+asyncpg://localhost/db", 100, pool_size=5)
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert options["pool_size"] == 5
+        assert options["connect_args"] == {"prepared_statement_cache_size": 100}
+
+
+@pytest.mark.asyncio
+class TestPoolStats:
+    async def test_checkouts_and_timeouts(self, tmp_path):
+        events = []
+        subscriber = instrumentation.subscribe(lambda event, data: events.append((event, data)))
+        database = await make_database(
+            tmp_path / "primary.db",
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+        try:
+            async with database.read():
+                [stats] = database.pool_stats()
+                assert stats["pool"] == "primary"
+                assert stats["checked_out"] == 1
+                with pytest.raises(sa.exc.TimeoutError):
+                    async with database.read():
+                        pass
+            [stats] = database.pool_stats()
+        finally:
+            instrumentation.unsubscribe(subscriber)
+            await database.dispose()
+
+        assert stats["checked_out"] == 0
+        assert stats["timeouts"] == 1
+        assert stats["checkouts"] >= 2
+        assert stats["max_wait"] >= 0
+        assert "db.pool.checkout" in [event for event, _ in events]
+        assert "db.pool.timeout" in [event for event, _ in events]
@@ -0,0 +1,105 @@
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwt
+
+from src.repository.jwt import JWTDecodeError, JWTExpiredError, JWTHandler
+from src.repository.jwt_keys import KeyRing
+
+
+class TestJWTHandler:
+    def test_decode_caches_verified_claims(self):
+        token = JWTHandler.encode(payload={"user_id": "cached"})
+        hits, misses = JWTHandler.token_cache.hits, JWTHandler.token_cache.misses
+        assert JWTHandler.decode(token)["user_id"] == "cached"
+        assert JWTHandler.decode(token)["user_id"] == "cached"
+        assert JWTHandler.decode_expired(token)["user_id"] == "cached"
+        assert JWTHandler.token_cache.misses == misses + 1
+        assert JWTHandler.token_cache.hits == hits + 2
+
+    def test_cached_claims_are_copies(self):
+        token = JWTHandler.encode(payload={"user_id": "copy"})
+        JWTHandler.decode(token)["user_id"] = "changed"
+        assert JWTHandler.decode(token)["user_id"] == "copy"
+
+    def test_invalid_and_expired_tokens_are_not_cached(self):
+        size = len(JWTHandler.token_cache)
+        with pytest.raises(JWTDecodeError):
+            JWTHandler.decode(JWTHandler.encode(payload={"user_id": "x"}) + "tampered")
+        expired = jwt.encode(
+            {"user_id": "x", "exp": int(time.time()) - 10},
+            JWTHandler.secret_key,
+            algorithm=JWTHandler.algorithm,
+        )
+        with pytest.raises(JWTExpiredError):
+            JWTHandler.decode(expired)
+        assert JWTHandler.decode_expired(expired)["user_id"] == "x"
+        assert len(JWTHandler.token_cache) == size
+
+
+def write_ec_key(path, curve=ec.SECP256R1, public=False):
+    private_key = ec.generate_private_key(curve())
+    if public:
+        pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+    else:
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    path.write_bytes(pem)
+    return str(path)
+
+
+class TestKeyRing:
+    def test_sign_and_rotate(self, tmp_path, monkeypatch):
+        old_key = write_ec_key(tmp_path / "old.pem")
+        new_key = write_ec_key(tmp_path / "new.pem", curve=ec.SECP384R1)
+        monkeypatch.setattr(JWTHandler, "key_ring", KeyRing.from_files([old_key, new_key]))
+
+        old_token = JWTHandler.encode(payload={"user_id": "rotated"})
+        assert jwt.get_unverified_header(old_token)["kid"] == "old"
+        assert jwt.get_unverified_header(old_token)["alg"] == "ES256"
+
+        JWTHandler.key_ring.activate("new")
+        new_token = JWTHandler.encode(payload={"user_id": "rotated"})
+        assert jwt.get_unverified_header(new_token)["alg"] == "ES384"
+        assert JWTHandler.decode(old_token)["user_id"] == "rotated"
+        assert JWTHandler.decode(new_token)["user_id"] == "rotated"
+
+        jwks = JWTHandler.jwks()
+        assert {key["kid"] for key in jwks["keys"]} == {"old", "new"}
+        assert all("d" not in key for key in jwks["keys"])
+
+    def test_retired_key_revokes_cached_tokens(self, tmp_path, monkeypatch):
+        old_key = write_ec_key(tmp_path / "old.pem")
+        new_key = write_ec_key(tmp_path / "new.pem")
+        monkeypatch.setattr(JWTHandler, "key_ring", KeyRing.from_files([old_key, new_key]))
+        token = JWTHandler.encode(payload={"user_id": "retired"})
+        assert JWTHandler.decode(token)["user_id"] == "retired"
+        assert JWTHandler.decode_expired(token)["user_id"] == "retired"
+
+        JWTHandler.key_ring.activate("new")
+        JWTHandler.key_ring.remove("old")
+        with pytest.raises(JWTDecodeError):
+            JWTHandler.decode(token)
+        with pytest.raises(JWTDecodeError):
+            JWTHandler.decode_expired(token)
+        with pytest.raises(ValueError):
+            JWTHandler.key_ring.remove("new")
+
+    def test_unknown_kid_is_rejected(self, tmp_path, monkeypatch):
+        signer = KeyRing.from_files([write_ec_key(tmp_path / "signer.pem")])
+        other_key = write_ec_key(tmp_path / "other.pem", public=True)
+        verifier = KeyRing.from_files(public_keys=[other_key])
+        monkeypatch.setattr(JWTHandler, "key_ring", signer)
+        token = JWTHandler.encode(payload={"user_id": "x"})
+        monkeypatch.setattr(JWTHandler, "key_ring", verifier)
+        with pytest.raises(JWTDecodeError):
+            JWTHandler.decode(token)
+        with pytest.raises(ValueError):
+            verifier.activate("other")
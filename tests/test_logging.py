@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.core.logging import FileSink, HTTPSink, LogShipper
+
+
+class MemorySink:
+    def __init__(self) -> None:
+        self.batches: list[list[dict]] = []
+        self.closed = False
+
+    async def write(self, records: list[dict]) -> None:
+        self.batches.append(records)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FailingSink(MemorySink):
+    async def write(self, records: list[dict]) -> None:
+        raise ConnectionError("collector is down")
+
+
+class SlowSink(MemorySink):
+    async def write(self, records: list[dict]) -> None:
+        await asyncio.sleep(0.05)
+        self.batches.append(records)
+
+
+@pytest.mark.asyncio
+class TestLogShipper:
+    async def test_flushes_on_batch_size(self):
+        sink = MemorySink()
+        shipper = LogShipper(sink, batch_size=3, flush_interval=60)
+        await shipper.start()
+        for number in range(7):
+            shipper.ship({"n": number})
+        await asyncio.sleep(0.01)
+        assert [len(batch) for batch in sink.batches] == [3, 3]
+
+        await shipper.stop()
+        assert [record["n"] for batch in sink.batches for record in batch] == list(range(7))
+        assert shipper.stats.shipped == 7
+        assert sink.closed
+
+    async def test_flushes_on_interval(self):
+        sink = MemorySink()
+        shipper = LogShipper(sink, batch_size=100, flush_interval=0.02)
+        await shipper.start()
+        shipper.ship({"n": 1})
+        await asyncio.sleep(0.05)
+        assert sink.batches == [[{"n": 1}]]
+        await shipper.stop()
+
+    async def test_drops_on_overflow(self):
+        sink = MemorySink()
+        shipper = LogShipper(sink, max_queue=2)
+        for number in range(5):
+            shipper.ship({"n": number})
+        assert shipper.stats.dropped == 3
+        await shipper.stop()
+        assert shipper.stats.shipped == 2
+
+    async def test_counts_failed_batches(self):
+        shipper = LogShipper(FailingSink(), batch_size=10)
+        shipper.ship({"n": 1})
+        await shipper.stop()
+        assert shipper.stats.failed == 1
+        assert shipper.stats.shipped == 0
+
+    async def test_stop_waits_for_in_flight_write(self):
+        sink = SlowSink()
+        shipper = LogShipper(sink, batch_size=2, flush_interval=60)
+        await shipper.start()
+        for number in range(3):
+            shipper.ship({"n": number})
+        await asyncio.sleep(0.01)
+        assert sink.batches == []  # the first batch is still being written
+
+        await shipper.stop()
+        assert [record["n"] for batch in sink.batches for record in batch] == [0, 1, 2]
+        assert shipper.stats.shipped == 3
+        assert shipper.stats.failed == 0
+
+    async def test_disabled_without_sink(self):
+        shipper = LogShipper(None)
+        shipper.ship({"n": 1})
+        await shipper.start()
+        assert shipper.queue.empty()
+        await shipper.stop()
+
+
+@pytest.mark.asyncio
+class TestSinks:
+    async def test_file_sink_writes_json_lines(self, tmp_path):
+        sink = FileSink(tmp_path / "requests.log")
+        await sink.write([{"n": 1}, {"n": 2}])
+        lines = (tmp_path / "requests.log").read_text().splitlines()
+        assert [json.loads(line) for line in lines] == [{"n": 1}, {"n": 2}]
+
+    async def test_http_sink_posts_batch(self):
+        received = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            received.append(json.loads(request.content))
+            return httpx.Response(204)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        sink = HTTPSink("http://collector/ingest", client=client)
+        await sink.write([{"n": 1}])
+        await sink.close()
+        assert received == [[{"n": 1}]]
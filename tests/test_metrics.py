@@ -0,0 +1,98 @@
+import pytest
+
+from src.core.config import settings
+from src.core.instrumentation import Instrumentation, instrumentation, instrumented
+from src.core.logging import log_shipper
+from src.core.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    def test_counter_and_histogram_render(self):
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requests", ["route"])
+        latency = registry.histogram("latency_seconds", "Latency", ["route"], buckets=[0.1, 1])
+        requests.inc("/a")
+        requests.inc("/a")
+        latency.observe(0.05, "/a")
+        latency.observe(0.5, "/a")
+        latency.observe(5, "/a")
+
+        text = registry.render()
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{route="/a"} 2' in text
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{route="/a"} 3' in text
+        assert 'latency_seconds_sum{route="/a"} 5.55' in text
+
+    def test_callback_and_escaping(self):
+        registry = MetricsRegistry()
+        registry.callback("pending", "Pending jobs", ["pool"], lambda: [(('a"b',), 3)])
+        assert 'pending{pool="a\\"b"} 3' in registry.render()
+        with pytest.raises(ValueError):
+            registry.counter("pending", "Duplicate")
+
+
+@pytest.mark.asyncio
+class TestInstrumented:
+    async def test_emits_operation_events(self):
+        events = []
+        subscriber = instrumentation.subscribe(lambda event, data: events.append((event, data)))
+
+        @instrumented("test.sync")
+        def sync_operation():
+            return 1
+
+        @instrumented("test.async")
+        async def async_operation():
+            raise RuntimeError
+
+        try:
+            assert sync_operation() == 1
+            with pytest.raises(RuntimeError):
+                await async_operation()
+        finally:
+            instrumentation.unsubscribe(subscriber)
+
+        operations = [(data["name"], data["error"]) for event, data in events]
+        assert ("test.sync", False) in operations
+        assert ("test.async", True) in operations
+
+    async def test_failing_subscriber_is_isolated(self):
+        hook = Instrumentation()
+
+        def failing(event, data):
+            raise RuntimeError
+
+        hook.subscribe(failing)
+        hook.emit("anything")
+
+    async def test_metrics_endpoint_requires_admin_key(self, http_client, monkeypatch):
+        assert (await http_client.get("/internal/metrics")).status_code == 403
+        monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-key")
+        response = await http_client.get("/internal/metrics", headers={"X-Admin-Key": "wrong"})
+        assert response.status_code == 403
+
+    async def test_metrics_scrapes_are_not_shipped(self, http_client, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-key")
+        shipped = []
+        monkeypatch.setattr(log_shipper, "sink", object())
+        monkeypatch.setattr(log_shipper, "ship", shipped.append)
+        response = await http_client.get("/internal/metrics", headers={"X-Admin-Key": "admin-key"})
+        assert response.status_code == 200
+        assert shipped == []
+
+    async def test_metrics_endpoint(self, http_client, monkeypatch):
+        monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-key")
+        await http_client.get("/auth/.well-known/jwks.json")
+        await http_client.post("/auth/register", json={"username": "metrics", "password": "pw"})
+        response = await http_client.get("/internal/metrics", headers={"X-Admin-Key": "admin-key"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        route = 'route="/auth/.well-known/jwks.json"'
+        assert f'http_requests_total{{method="GET",{route},status="200"}}' in text
+        assert 'operation_duration_seconds_count{operation="password.hash"}' in text
+        assert 'operation_duration_seconds_count{operation="users.create"}' in text
+        assert "worker_pool_pending" in text
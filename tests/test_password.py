@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest
+
+from src.core.config import settings
+from src.core.executor import WorkerPool, WorkerPoolFullError
+from src.core.fastapi import PasswordCalibration
+from src.repository.password import PasswordHandler, build_context, calibrate_rounds
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.mark.asyncio
+class TestPasswordHandler:
+    async def test_hash_and_verify_async(self):
+        hashed = await PasswordHandler.hash_async("secret")
+        assert await PasswordHandler.verify_async(hashed, "secret")
+        assert not await PasswordHandler.verify_async(hashed, "not-secret")
+        assert PasswordHandler.verify(hashed, "secret")
+
+    async def test_pool_is_bounded(self):
+        pool = WorkerPool(kind="thread", max_workers=1, max_pending=2)
+        tasks = [asyncio.ensure_future(pool.run(_sleep, 0.05)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert pool.stats.pending == 2
+        with pytest.raises(WorkerPoolFullError):
+            await pool.run(_sleep, 0.05)
+        await asyncio.gather(*tasks)
+        assert pool.stats.as_dict()["pending"] == 0
+        assert pool.stats.completed == 2
+        assert pool.stats.rejected == 1
+        assert pool.stats.max_latency >= 0.05
+        pool.shutdown()
+
+    async def test_process_pool(self):
+        pool = WorkerPool(kind="process", max_workers=1, max_pending=4)
+        assert await pool.run(_sleep, 0) == 0
+        pool.shutdown()
+
+    async def test_calibrate_rounds(self):
+        rounds, timings = calibrate_rounds(target_ms=0, max_rounds=6, samples=1)
+        assert rounds == 4
+        assert list(timings) == [4]
+        rounds, timings = calibrate_rounds(target_ms=10_000, max_rounds=5, samples=1)
+        assert rounds == 5
+
+    async def test_startup_calibration_runs_in_the_background(self, monkeypatch):
+        monkeypatch.setattr(settings, "BCRYPT_CALIBRATE_ON_STARTUP", True)
+        monkeypatch.setattr(settings, "BCRYPT_TARGET_MS", 0)
+        submitted = PasswordHandler.pool.stats.submitted
+        try:
+            await PasswordCalibration.start()
+            await PasswordCalibration.task
+            assert PasswordHandler.pool.stats.submitted == submitted + 1
+            assert PasswordHandler.hash("secret").startswith("$2b$04$")
+        finally:
+            await PasswordCalibration.stop()
+            PasswordHandler.configure(settings.BCRYPT_ROUNDS)
+
+    async def test_needs_update_after_configure(self):
+        weak_hash = build_context(4).hash("secret")
+        strong_hash = build_context(6).hash("secret")
+        PasswordHandler.configure(5)
+        try:
+            assert PasswordHandler.needs_update(weak_hash)
+            assert not PasswordHandler.needs_update(strong_hash)
+            new_hash = await PasswordHandler.hash_async("secret")
+            assert new_hash.startswith("$2b$05$")
+            assert not PasswordHandler.needs_update(new_hash)
+            assert await PasswordHandler.verify_async(weak_hash, "secret")
+        finally:
+            PasswordHandler.configure(settings.BCRYPT_ROUNDS)
@@ -0,0 +1,38 @@
+import pytest
+
+from src.controllers.auth import AuthController
+from src.core.redis.client import RedisKey
+from src.repository.users import UserRepository
+from tests.shared.mocks.redis import RedisMock
+
+
+@pytest.mark.asyncio
+class TestProfileCache:
+    async def test_me_reads_through_redis(self, mock_database, monkeypatch):
+        redis = RedisMock()
+        controller = AuthController(db_session=mock_database, redis_session=redis)
+        await controller.register(password="string", username="cached-profile")
+        user = await UserRepository().get_by_username("cached-profile", db_session=mock_database)
+        assert user is not None
+
+        queries = []
+        query_by_id = UserRepository.query_by_id
+
+        async def counting_query_by_id(self, user_id, db_session):
+            queries.append(user_id)
+            return await query_by_id(self, user_id, db_session)
+
+        monkeypatch.setattr(UserRepository, "query_by_id", counting_query_by_id)
+        first = await controller.me(user.id)
+        second = await controller.me(user.id)
+        assert first == second
+        assert first.username == "cached-profile"
+        assert len(queries) == 1
+        assert RedisKey.profile(user.id) in RedisMock.database
+
+        await UserRepository().update_password(
+            user.id, "new-hash", db_session=mock_database, redis_session=redis
+        )
+        assert RedisKey.profile(user.id) not in RedisMock.database
+        await controller.me(user.id)
+        assert len(queries) == 2
@@ -0,0 +1,42 @@
+import base64
+
+import pytest
+from httpx import AsyncClient
+
+from src.repository.csrf import CSRFHandler
+from src.repository.jwt import JWTHandler
+from src.repository.qr_code import QRCodeHandler, QRFormat
+
+
+@pytest.mark.asyncio
+class TestQRCode:
+    data = {"username": "qr-user", "password": "string"}
+
+    async def test_register_without_qr(self, http_client: AsyncClient):
+        response = await http_client.post("/auth/register", json=self.data)
+        assert response.status_code == 200
+        assert response.json()["qr_img"] is None
+        assert response.json()["provisioning_uri"].startswith("otpauth://totp/")
+
+    async def test_register_with_svg_qr(self, http_client: AsyncClient):
+        data = {**self.data, "username": "qr-user-svg"}
+        response = await http_client.post("/auth/register?qr_format=svg", json=data)
+        assert response.status_code == 200
+        assert base64.b64decode(response.json()["qr_img"]).startswith(b"<?xml")
+
+    async def test_qr_requires_verified_session(self, http_client: AsyncClient):
+        # What login hands out before /verify: a refresh token and its CSRF token.
+        refresh_token = JWTHandler.encode_refresh_token({"sub": "refresh_token", "verify": "x"})
+        headers = {"Authorization": f"Bearer {CSRFHandler.encode(refresh_token=refresh_token)}"}
+        response = await http_client.get(
+            "/auth/qr", headers=headers, cookies={"Refresh-Token": refresh_token}
+        )
+        assert response.status_code == 403
+
+    async def test_render_is_cached(self):
+        misses = QRCodeHandler.cache.misses
+        first = await QRCodeHandler.render("otpauth://totp/x", QRFormat.PNG)
+        second = await QRCodeHandler.render("otpauth://totp/x", QRFormat.PNG)
+        assert first is second
+        assert first.startswith(b"\x89PNG")
+        assert QRCodeHandler.cache.misses == misses + 1
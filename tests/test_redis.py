@@ -0,0 +1,298 @@
+import asyncio
+import uuid
+
+import pytest
+from redis.asyncio.client import Pipeline, Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.controllers.auth import AuthController
+from src.core.config import settings
+from src.core.exceptions import UnauthorizedException
+from src.core.redis.client import (
+    ROTATE_REFRESH_TOKEN_SCRIPT,
+    RedisKey,
+    RedisManager,
+    RedisPipeline,
+    RotationResult,
+)
+from src.core.redis.local_cache import MISSING, LocalCache
+from tests.shared.mocks.redis import RedisMock
+
+
+class FakePipeline(Pipeline):
+    """Records the commands a RedisPipeline queues instead of sending them."""
+
+    def __init__(self, results):
+        self.command_stack = []
+        self.results = results
+
+    def execute_command(self, *args, **kwargs):
+        self.command_stack.append(args)
+        return self
+
+    async def execute(self, raise_on_error: bool = True):
+        return self.results
+
+    async def reset(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+@pytest.mark.asyncio
+class TestRedisPipeline:
+    async def test_queues_serialized_commands(self):
+        manager = RedisManager()
+        fake = FakePipeline(results=[b"user", 10, True, 1])
+        pipeline = RedisPipeline(manager, fake)
+        results = await (
+            pipeline.get("session").ttl("session").set("token", "user", ex=10).delete("old")
+        ).execute()
+        assert results == ["user", 10, True, 1]
+        assert [command[0] for command in fake.command_stack] == ["GET", "TTL", "SET", "DEL"]
+
+    async def test_context_manager_executes_on_exit(self):
+        fake = FakePipeline(results=[True])
+        async with RedisPipeline(RedisManager(), fake) as pipeline:
+            pipeline.delete("token")
+        assert fake.command_stack == [("DEL", "token")]
+
+
+class TestRedisKey:
+    def test_keys_are_prefixed_fixed_length_digests(self):
+        long_key = RedisKey.refresh_token("x" * 500)
+        short_key = RedisKey.refresh_token("y")
+        assert long_key.startswith("rt:") and short_key.startswith("rt:")
+        assert len(long_key) == len(short_key) == 25
+        assert RedisKey.session("a" * 32).startswith("sid:")
+        assert RedisKey.session("a" * 32) == RedisKey.session("a" * 32)
+        assert RedisKey.session("token") != RedisKey.refresh_token("token")
+
+
+@pytest.mark.asyncio
+class TestRefreshTokenRotation:
+    async def test_rotation_consumes_old_token_once(self):
+        redis = RedisMock()
+        RedisMock.database.update(
+            {
+                RedisKey.refresh_token("old-token"): "user-id",
+                RedisKey.session("session-id"): "user-id",
+            }
+        )
+        controller = AuthController(db_session=None, redis_session=redis)  # type: ignore
+
+        tokens = await controller.refresh_token("old-token", "session-id", "user-id")
+        assert RedisKey.refresh_token("old-token") not in RedisMock.database
+        assert RedisMock.database[RedisKey.refresh_token(tokens.refresh_token)] == "user-id"
+        with pytest.raises(UnauthorizedException):
+            await controller.refresh_token("old-token", "session-id", "user-id")
+
+    async def test_rotation_requires_verified_session(self):
+        RedisMock.database.update({RedisKey.refresh_token("unverified-token"): "user-id"})
+        controller = AuthController(db_session=None, redis_session=RedisMock())  # type: ignore
+        with pytest.raises(UnauthorizedException) as exc_info:
+            await controller.refresh_token("unverified-token", "other-session", "user-id")
+        assert "verify" in exc_info.value.message
+        assert RedisMock.database[RedisKey.refresh_token("unverified-token")] == "user-id"
+
+
+class FakeScript:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    async def __call__(self, keys, args, client):
+        self.calls.append((keys, args, client))
+        return self.result
+
+
+class FakeScriptRedis:
+    def __init__(self, script):
+        self.script = script
+        self.registered = []
+
+    def register_script(self, source):
+        self.registered.append(source)
+        return self.script
+
+
+@pytest.mark.asyncio
+class TestRotateRefreshTokenScript:
+    @pytest.mark.parametrize(
+        "reply, expected",
+        [
+            (1, RotationResult.ROTATED),
+            (0, RotationResult.INVALID),
+            (-1, RotationResult.NOT_VERIFIED),
+        ],
+    )
+    async def test_keys_args_and_result(self, reply, expected, monkeypatch):
+        monkeypatch.setattr(RedisManager, "rotate_refresh_token_script", None)
+        script = FakeScript(reply)
+        manager = RedisManager()
+        manager.redis = FakeScriptRedis(script)  # type: ignore
+        for _ in range(2):
+            result = await manager.rotate_refresh_token(
+                "rt:old", "rt:new", "sid:session", uuid.UUID(int=1)
+            )
+            assert result is expected
+        # Registered once, then reused for every call (EVALSHA with NOSCRIPT fallback).
+        assert manager.redis.registered == [ROTATE_REFRESH_TOKEN_SCRIPT]
+        keys, args, client = script.calls[0]
+        assert keys == ["rt:old", "rt:new", "sid:session"]
+        assert args == [str(uuid.UUID(int=1))]
+        assert client is manager.redis
+
+    async def test_against_redis_server(self, monkeypatch):
+        redis = Redis.from_url(settings.REDIS_URL)
+        try:
+            await redis.ping()
+        except (RedisConnectionError, OSError):
+            await redis.close()
+            pytest.skip("no redis server available")
+        monkeypatch.setattr(RedisManager, "rotate_refresh_token_script", None)
+        manager = RedisManager()
+        manager.redis = redis
+        prefix = f"test-rotation:{uuid.uuid4().hex}:"
+        old, new, session = prefix + "old", prefix + "new", prefix + "session"
+        try:
+            await redis.set(old, "user-id", px=60_000)
+            assert await manager.rotate_refresh_token(old, new, session, "user-id") is (
+                RotationResult.NOT_VERIFIED
+            )
+            await redis.set(session, "user-id")
+            assert await manager.rotate_refresh_token(old, new, session, "other") is (
+                RotationResult.INVALID
+            )
+            assert await manager.rotate_refresh_token(old, new, session, "user-id") is (
+                RotationResult.ROTATED
+            )
+            assert await redis.get(old) is None
+            assert await redis.get(new) == b"user-id"
+            assert 0 < await redis.pttl(new) <= 60_000
+            assert await manager.rotate_refresh_token(old, new, session, "user-id") is (
+                RotationResult.INVALID
+            )
+        finally:
+            await redis.delete(old, new, session)
+            await redis.close()
+
+
+class FakeRedisPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def mget(self, names):
+        self.commands.append(lambda: [self.redis.data.get(name) for name in names])
+
+    def pttl(self, name):
+        self.commands.append(lambda: self.redis.pttl(name))
+
+    async def execute(self):
+        self.redis.mget_calls += 1
+        return [command() for command in self.commands]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+class FakeRedis:
+    """Just enough of the redis client for RedisManager, fanning publishes out locally."""
+
+    def __init__(self, subscribers):
+        self.data = {}
+        self.ttls = {}
+        self.mget_calls = 0
+        self.subscribers = subscribers
+
+    async def mget(self, names):
+        self.mget_calls += 1
+        return [self.data.get(name) for name in names]
+
+    def pttl(self, name):
+        if name not in self.data:
+            return -2
+        return self.ttls.get(name, -1)
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self)
+
+    async def set(self, name, value, ex):
+        self.data[name] = str(value).encode()
+        self.ttls[name] = ex * 1000
+        return True
+
+    async def delete(self, name):
+        self.ttls.pop(name, None)
+        return int(self.data.pop(name, None) is not None)
+
+    async def publish(self, channel, message):
+        for subscriber in self.subscribers:
+            subscriber.handle_message({"type": "message", "channel": channel, "data": message})
+
+
+@pytest.mark.asyncio
+class TestLocalCache:
+    async def test_session_reads_are_served_locally_until_invalidated(self, monkeypatch):
+        local_cache = LocalCache(prefixes=[RedisKey.SESSION], channel="invalidate")
+        other_process = LocalCache(prefixes=[RedisKey.SESSION], channel="invalidate")
+        local_cache.subscribed = other_process.subscribed = True
+        monkeypatch.setattr(RedisManager, "local_cache", local_cache)
+        manager = RedisManager()
+        manager.redis = FakeRedis(subscribers=[local_cache, other_process])  # type: ignore
+
+        session_key = RedisKey.session("session-id")
+        other_process.set(session_key, "stale")
+        # Misses go to redis every time, so a deleted or expired key is never kept alive.
+        assert await manager.get(session_key) is None
+        assert await manager.get(session_key) is None
+        assert manager.redis.mget_calls == 2
+
+        await manager.set(session_key, "user-id", ex=10)
+        assert other_process.get(session_key) is MISSING
+        assert await manager.mget(session_key, "uncached") == ["user-id", None]
+        assert await manager.get(session_key) == "user-id"
+        assert manager.redis.mget_calls == 3
+
+        await manager.delete(session_key)
+        assert await manager.get(session_key) is None
+
+    async def test_local_copy_expires_with_the_redis_key(self, monkeypatch):
+        local_cache = LocalCache(prefixes=[RedisKey.SESSION], channel="invalidate", ttl=30)
+        local_cache.subscribed = True
+        monkeypatch.setattr(RedisManager, "local_cache", local_cache)
+        manager = RedisManager()
+        manager.redis = FakeRedis(subscribers=[local_cache])  # type: ignore
+
+        session_key = RedisKey.session("session-id")
+        manager.redis.data[session_key] = b"user-id"
+        manager.redis.ttls[session_key] = 20
+        assert await manager.get(session_key) == "user-id"
+        assert local_cache.get(session_key) == "user-id"
+        await asyncio.sleep(0.03)
+        assert local_cache.get(session_key) is MISSING
+
+    async def test_value_read_before_an_invalidation_is_not_stored(self):
+        local_cache = LocalCache(prefixes=[RedisKey.PROFILE], channel="invalidate")
+        local_cache.subscribed = True
+        profile_key = RedisKey.profile("user-id")
+        generation = local_cache.generation
+        local_cache.invalidate([profile_key])
+        local_cache.set(profile_key, "stale", generation)
+        assert local_cache.get(profile_key) is MISSING
+        local_cache.set(profile_key, "fresh", local_cache.generation)
+        assert local_cache.get(profile_key) == "fresh"
+
+    async def test_cache_is_bypassed_until_subscribed(self):
+        local_cache = LocalCache(prefixes=[RedisKey.SESSION], channel="invalidate")
+        local_cache.set(RedisKey.session("session-id"), "user-id")
+        assert local_cache.get(RedisKey.session("session-id")) is MISSING
+        assert not local_cache.handles(RedisKey.refresh_token("token"))
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from src.core.middleware.response_logger import ResponseLoggerMiddleware
+
+
+async def binary(request):
+    return Response(b"\x00\xff" * 8, media_type="application/octet-stream")
+
+
+async def streamed(request):
+    async def chunks():
+        for chunk in (b"abc", b"def", b"ghi"):
+            yield chunk
+
+    return StreamingResponse(chunks())
+
+
+async def tokens(request):
+    response = JSONResponse({"username": "bob", "gauth": "SEED", "nested": [{"csrf_token": "t"}]})
+    response.set_cookie("Refresh-Token", "secret")
+    response.headers["X-CSRF-TOKEN"] = "csrf"
+    return response
+
+
+def make_client(records: list, **kwargs) -> AsyncClient:
+    app = Starlette(
+        routes=[
+            Route("/binary", binary),
+            Route("/streamed", streamed),
+            Route("/tokens", tokens),
+            Route("/auth/tokens", tokens),
+        ]
+    )
+    middleware = ResponseLoggerMiddleware(app, sink=records.append, **kwargs)
+    return AsyncClient(app=middleware, base_url="http://test")
+
+
+@pytest.mark.asyncio
+class TestResponseLoggerMiddleware:
+    async def test_captures_raw_bytes(self):
+        records = []
+        async with make_client(records, sample_rate=1, max_body_bytes=1024) as client:
+            response = await client.get("/binary")
+        assert response.content == b"\x00\xff" * 8
+        [record] = records
+        assert (record.method, record.path, record.status_code) == ("GET", "/binary", 200)
+        assert record.body == b"\x00\xff" * 8
+        assert not record.truncated
+
+    async def test_truncates_streamed_body(self):
+        records = []
+        async with make_client(records, sample_rate=1, max_body_bytes=4) as client:
+            response = await client.get("/streamed")
+        assert response.content == b"abcdefghi"
+        [record] = records
+        assert record.body == b"abcd"
+        assert record.size == 9
+        assert record.truncated
+
+    async def test_unsampled_requests_pass_through(self):
+        records = []
+        async with make_client(records, sample_rate=0) as client:
+            response = await client.get("/binary")
+        assert response.status_code == 200
+        assert records == []
+
+    async def test_failing_sink_does_not_break_response(self):
+        def failing_sink(record):
+            raise RuntimeError("sink is down")
+
+        app = Starlette(routes=[Route("/binary", binary)])
+        middleware = ResponseLoggerMiddleware(app, sample_rate=1, sink=failing_sink)
+        async with AsyncClient(app=middleware, base_url="http://test") as client:
+            response = await client.get("/binary")
+        assert response.status_code == 200
+
+    async def test_captures_metadata_only_by_default(self):
+        records = []
+        async with make_client(records, sample_rate=1) as client:
+            await client.get("/binary")
+        [record] = records
+        assert record.body == b""
+        assert record.size == 16
+
+    async def test_redacts_headers_and_json_fields(self):
+        records = []
+        async with make_client(records, sample_rate=1, max_body_bytes=1024) as client:
+            response = await client.get("/tokens")
+        assert response.json()["gauth"] == "SEED"
+        [record] = records
+        assert record.headers["set-cookie"] == "[redacted]"
+        assert record.headers["x-csrf-token"] == "[redacted]"
+        assert json.loads(record.body) == {
+            "username": "bob",
+            "gauth": "[redacted]",
+            "nested": [{"csrf_token": "[redacted]"}],
+        }
+
+    async def test_truncated_json_is_dropped(self):
+        records = []
+        async with make_client(records, sample_rate=1, max_body_bytes=10) as client:
+            await client.get("/tokens")
+        assert records[0].body == b""
+
+    async def test_skips_body_on_bodyless_paths(self):
+        records = []
+        async with make_client(records, sample_rate=1, max_body_bytes=1024) as client:
+            await client.get("/auth/tokens")
+        [record] = records
+        assert record.body == b""
+        assert record.status_code == 200
@@ -0,0 +1,58 @@
+import time
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from src.core.middleware.session import SessionMiddleware, parse_session_cookie
+
+
+async def echo_session(request: Request):
+    return PlainTextResponse(request.state.session_id)
+
+
+def make_client(**kwargs) -> AsyncClient:
+    app = Starlette(routes=[Route("/", echo_session)])
+    return AsyncClient(app=SessionMiddleware(app, **kwargs), base_url="http://test")
+
+
+class TestParseSessionCookie:
+    def test_parse(self):
+        assert parse_session_cookie("abc.123") == ("abc", 123)
+        assert parse_session_cookie("abc") == ("abc", None)
+        assert parse_session_cookie("abc.x") == ("abc", None)
+        assert parse_session_cookie("bad id;") == (None, None)
+        assert parse_session_cookie(None) == (None, None)
+
+
+@pytest.mark.asyncio
+class TestSessionMiddleware:
+    async def test_mints_session_once(self):
+        async with make_client(max_age=3600, refresh_before=60) as client:
+            response = await client.get("/")
+            session_id = response.text
+            assert response.headers["set-cookie"].startswith(f"Session-Id={session_id}.")
+            assert "Max-Age=3600" in response.headers["set-cookie"]
+
+            response = await client.get("/")
+            assert response.text == session_id
+            assert "set-cookie" not in response.headers
+
+    async def test_refreshes_near_expiry(self):
+        issued_at = int(time.time()) - 3590
+        async with make_client(max_age=3600, refresh_before=60) as client:
+            client.cookies.set("Session-Id", f"abcdef.{issued_at}")
+            response = await client.get("/")
+            assert response.text == "abcdef"
+            cookie = response.headers["set-cookie"]
+            assert cookie.startswith("Session-Id=abcdef.")
+            assert int(cookie.split(";")[0].split(".")[1]) > issued_at
+
+    async def test_upgrades_legacy_cookie(self):
+        async with make_client() as client:
+            response = await client.get("/", headers={"Cookie": "other=1; Session-Id=legacy"})
+            assert response.text == "legacy"
+            assert response.headers["set-cookie"].startswith("Session-Id=legacy.")
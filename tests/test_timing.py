@@ -0,0 +1,39 @@
+import time
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from httpx import AsyncClient
+
+from src.core.timing import TimingEqualizer
+
+
+@pytest.mark.asyncio
+class TestTimingEqualizer:
+    async def test_pad_up_to_floor(self):
+        equalizer = TimingEqualizer(floor=0.05, jitter=0.01)
+        start_time = time.perf_counter()
+        await equalizer.pad(start_time)
+        assert 0.05 <= time.perf_counter() - start_time < 0.2
+
+    async def test_route_class_pads_success_and_errors(self):
+        equalizer = TimingEqualizer(floor=0.05)
+        router = APIRouter(route_class=equalizer.route_class)
+
+        @router.get("/ok")
+        async def ok():
+            return {"ok": True}
+
+        @router.get("/fail")
+        async def fail():
+            raise ValueError("boom")
+
+        app = FastAPI()
+        app.include_router(router)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            for path in ("/ok", "/fail"):
+                start_time = time.perf_counter()
+                try:
+                    await client.get(path)
+                except ValueError:
+                    pass
+                assert time.perf_counter() - start_time >= 0.05
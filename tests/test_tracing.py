@@ -0,0 +1,98 @@
+import sys
+
+import pytest
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from src.core.database.pool import InstrumentedQueuePool
+from src.core.database.session import DBManager, SQLBase
+from src.core.instrumentation import instrumentation
+from src.core.tracing import build_exporter, configure_tracing, shutdown_tracing
+from src.repository.jwt import JWTHandler
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    provider = configure_tracing(exporter)
+    yield exporter
+    shutdown_tracing(provider)
+
+
+def spans_by_name(exporter: InMemorySpanExporter) -> dict:
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+
+@pytest.mark.asyncio
+class TestTracing:
+    async def test_request_spans_nest(self, http_client, exporter):
+        response = await http_client.post(
+            "/auth/register", json={"username": "traced", "password": "pw"}
+        )
+        assert response.status_code == 200
+
+        spans = spans_by_name(exporter)
+        server = spans["POST /auth/register"]
+        assert server.attributes["http.route"] == "/auth/register"
+        assert server.attributes["http.status_code"] == 200
+        controller = spans["auth.register"]
+        assert controller.parent.span_id == server.context.span_id
+        for name in ("users.create", "password.hash"):
+            assert spans[name].parent.span_id == controller.context.span_id
+            assert spans[name].context.trace_id == server.context.trace_id
+
+    async def test_cache_hit_attributes(self, http_client, exporter):
+        await http_client.get("/auth/.well-known/jwks.json")
+        spans = spans_by_name(exporter)
+        assert spans["GET /auth/.well-known/jwks.json"].attributes["http.status_code"] == 200
+
+        token = JWTHandler.encode({"user_id": "traced"})
+        JWTHandler.decode(token)
+        JWTHandler.decode(token)
+        decodes = [span for span in exporter.get_finished_spans() if span.name == "jwt.decode"]
+        assert [span.attributes["jwt.cache_hit"] for span in decodes] == [False, True]
+
+    async def test_pool_wait_attribute(self, tmp_path, exporter):
+        database = DBManager(
+            model_base=SQLBase,
+            db_url=f"sqlite+aiosqlite:///{tmp_path}/traced.db",
+            poolclass=InstrumentedQueuePool,
+        )
+        with instrumentation.operation("query"):
+            async with database.read():
+                pass
+        await database.dispose()
+        span = spans_by_name(exporter)["query"]
+        assert span.attributes["db.pool"] == "primary"
+        assert span.attributes["db.pool.wait_ms"] >= 0
+
+    async def test_disabled_tracing_records_nothing(self, http_client, monkeypatch):
+        exporter = InMemorySpanExporter()
+        shutdown_tracing(configure_tracing(exporter))
+        assert instrumentation.tracer is None
+
+        span_lookups = []
+        monkeypatch.setattr(
+            "src.core.instrumentation.trace.get_current_span",
+            lambda: span_lookups.append(1),
+        )
+        operations = []
+        subscriber = instrumentation.subscribe(lambda event, data: operations.append(event))
+        try:
+            response = await http_client.post(
+                "/auth/register", json={"username": "untraced", "password": "pw"}
+            )
+        finally:
+            instrumentation.unsubscribe(subscriber)
+        assert response.status_code == 200
+        assert operations  # instrumented code ran, only without spans
+        assert span_lookups == []
+        assert exporter.get_finished_spans() == ()
+
+
+def test_otlp_exporter_needs_optional_package(monkeypatch):
+    module = "opentelemetry.exporter.otlp.proto.http.trace_exporter"
+    monkeypatch.setitem(sys.modules, module, None)
+    with pytest.raises(RuntimeError, match="opentelemetry-exporter-otlp-proto-http"):
+        build_exporter("otlp")
+    with pytest.raises(ValueError):
+        build_exporter("zipkin")
@@ -0,0 +1,156 @@
+import asyncio
+import json
+
+import pytest
+
+from src.controllers.user_import import (
+    ImportFormat,
+    RecordParser,
+    UserImporter,
+    is_base32_secret,
+    iter_lines,
+)
+from src.core.config import settings
+from src.core.executor import WorkerPool
+from src.repository.password import PasswordHandler
+from src.repository.users import UserRepository
+
+
+async def as_lines(text: str):
+    for line in text.splitlines(keepends=True):
+        yield line
+
+
+async def as_chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+class TestRecordParser:
+    def test_csv_uses_header(self):
+        parser = RecordParser(ImportFormat.CSV)
+        assert parser.feed("username,password\r\n") is None
+        assert parser.feed('alice,"p,w"\n') == {"username": "alice", "password": "p,w"}
+        assert parser.feed("\n") is None
+
+    def test_ndjson_rejects_non_objects(self):
+        parser = RecordParser(ImportFormat.NDJSON)
+        assert parser.feed('{"username": "bob"}') == {"username": "bob"}
+        with pytest.raises(ValueError):
+            parser.feed("[1, 2]")
+
+    def test_is_base32_secret(self):
+        assert is_base32_secret("JBSWY3DPEHPK3PXP")
+        assert is_base32_secret("jbswy3dpehpk3pxp")
+        assert not is_base32_secret("not base32!")
+        assert not is_base32_secret("")
+
+
+@pytest.mark.asyncio
+class TestUserImporter:
+    async def test_iter_lines_splits_across_chunks(self):
+        lines = [line async for line in iter_lines(as_chunks(b"one\ntwo\nthree", 3))]
+        assert lines == ["one", "two", "three"]
+
+    async def test_import_batches(self, mock_database):
+        pre_hashed = PasswordHandler.hash("imported-secret")
+        records = [
+            {"username": "import-1", "password": "first"},
+            {"username": "import-2", "password_hash": pre_hashed, "gauth": "JBSWY3DPEHPK3PXP"},
+            {"username": "IMPORT-1", "password": "duplicate"},
+            {"username": "import-3", "password": "third"},
+            {"username": "", "password": "missing-username"},
+            {"username": "import-4", "password_hash": "not-a-hash"},
+            {"username": "import-5", "password": "fifth", "gauth": "not base32!"},
+        ]
+        text = "\n".join(json.dumps(record) for record in records) + "\n{broken\n"
+        progress = []
+        importer = UserImporter(
+            db_session=mock_database,
+            batch_size=2,
+            on_progress=lambda stats: progress.append(stats.inserted),
+            pool=WorkerPool(kind="thread", max_workers=2, max_pending=2),
+        )
+        stats = await importer.run(as_lines(text), ImportFormat.NDJSON)
+        importer.pool.shutdown()
+
+        assert (stats.read, stats.inserted, stats.skipped, stats.invalid) == (8, 3, 1, 4)
+        assert stats.batches == 2
+        assert progress == [2, 3]
+
+        repository = UserRepository()
+        first = await repository.get_by_username("import-1", db_session=mock_database)
+        second = await repository.get_by_username("import-2", db_session=mock_database)
+        assert PasswordHandler.verify(first.password, "first")
+        assert second.password == pre_hashed
+        assert second.gauth == "JBSWY3DPEHPK3PXP"
+        assert first.gauth
+
+    async def test_concurrent_imports_share_the_pool(self, mock_database):
+        pool = WorkerPool(kind="thread", max_workers=2, max_pending=2)
+        importers = [
+            UserImporter(db_session=mock_database, batch_size=10, pool=pool) for _ in range(2)
+        ]
+        texts = [
+            "\n".join(
+                json.dumps({"username": f"concurrent-{job}-{number}", "password": "pw"})
+                for number in range(20)
+            )
+            for job in range(2)
+        ]
+        PasswordHandler.configure(4)
+        try:
+            results = await asyncio.gather(
+                *(
+                    importer.run(as_lines(text), ImportFormat.NDJSON)
+                    for importer, text in zip(importers, texts)
+                ),
+                return_exceptions=True,
+            )
+        finally:
+            PasswordHandler.configure(settings.BCRYPT_ROUNDS)
+            pool.shutdown()
+        assert [stats.inserted for stats in results] == [20, 20]
+        assert pool.stats.rejected == 0
+
+    async def test_admin_endpoint(self, http_client, monkeypatch):
+        body = "username,password\nadmin-import,secret\n"
+        response = await http_client.post(
+            "/admin/users/import", params={"fmt": "csv"}, content=body
+        )
+        assert response.status_code == 403
+
+        monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-key")
+        response = await http_client.post(
+            "/admin/users/import",
+            params={"fmt": "csv"},
+            content=body,
+            headers={"X-Admin-Key": "wrong"},
+        )
+        assert response.status_code == 403
+
+        monkeypatch.setattr(UserImporter, "pool", WorkerPool("thread", max_workers=1))
+        response = await http_client.post(
+            "/admin/users/import",
+            params={"fmt": "csv"},
+            content=body,
+            headers={"X-Admin-Key": "admin-key"},
+        )
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "running"
+
+        for _ in range(100):
+            response = await http_client.get(
+                f"/admin/users/import/{job['id']}", headers={"X-Admin-Key": "admin-key"}
+            )
+            if response.json()["status"] != "running":
+                break
+            await asyncio.sleep(0.01)
+        assert response.json()["status"] == "done"
+        assert response.json()["inserted"] == 1
+
+        response = await http_client.get(
+            "/admin/users/import/missing", headers={"X-Admin-Key": "admin-key"}
+        )
+        assert response.status_code == 404
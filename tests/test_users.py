@@ -0,0 +1,41 @@
+import pytest
+import sqlalchemy as sa
+
+from src.controllers.auth import AuthController
+from src.core.exceptions import BadRequestException
+from src.repository.users import UserRepository
+
+
+@pytest.mark.asyncio
+class TestUserRepository:
+    async def test_username_lookup_is_case_insensitive(self, mock_database):
+        controller = AuthController(db_session=mock_database)
+        await controller.register(password="string", username="MixedCase")
+        user = await UserRepository().get_by_username("mixedCASE", db_session=mock_database)
+        assert user is not None
+        assert user.username == "MixedCase"
+        with pytest.raises(BadRequestException):
+            await controller.register(password="string", username="MIXEDCASE")
+
+    async def test_username_lookup_uses_index(self, mock_database):
+        query = UserRepository.adaptor.get_by_username("MixedCase")
+        async with mock_database.engine.connect() as conn:
+            compiled = query.compile(conn.sync_engine, compile_kwargs={"literal_binds": True})
+            plan = (await conn.execute(sa.text(f"EXPLAIN QUERY PLAN {compiled}"))).all()
+        assert "ix_users_username_normalized" in str(plan)
+
+    async def test_create_returns_none_on_conflict(self, mock_database):
+        repository = UserRepository()
+        user = await repository.create(
+            username="Inserted", password="x", gauth="y", db_session=mock_database
+        )
+        assert user is not None
+        assert (user.username, user.gauth) == ("Inserted", "y")
+        assert user.created_at is not None
+
+        duplicate = await repository.create(
+            username="INSERTED", password="x", gauth="z", db_session=mock_database
+        )
+        assert duplicate is None
+        stored = await repository.get_by_username("inserted", db_session=mock_database)
+        assert stored.gauth == "y"